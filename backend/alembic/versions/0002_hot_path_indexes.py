@@ -0,0 +1,43 @@
+"""Composite indexes for catalog filters and order history
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+GET /products filters on any mix of category/color/size and seeks on id;
+each index below ends in id so the common filter combinations are served
+in id order without a sort. GET /orders/my seeks on (created_at, id) for
+one user. order_items gets plain foreign-key indexes for loading an
+order's items and for product deletes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_products_category_color_size_id', 'products', ['category', 'color', 'size', 'id']),
+    ('ix_products_category_id', 'products', ['category', 'id']),
+    ('ix_products_color_size_id', 'products', ['color', 'size', 'id']),
+    ('ix_products_size_id', 'products', ['size', 'id']),
+    ('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_product_id', 'order_items', ['product_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
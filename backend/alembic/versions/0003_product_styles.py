@@ -0,0 +1,88 @@
+"""Product styles with per-size/color variants
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00.000000
+
+A style groups the products sharing (name, category) - one row per
+color/size SKU - and holds their shared display attributes. Existing
+products are backfilled: each (name, category) group becomes a style
+seeded from its oldest product. The per-product name, description, price
+and image_url columns are kept so GET /products is unchanged.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_column(table: str, column: str) -> bool:
+    return any(info['name'] == column for info in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def upgrade() -> None:
+    if not _has_table('product_styles'):
+        op.create_table(
+            'product_styles',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('category', sa.String(length=100), nullable=False),
+            sa.Column('image_url', sa.String(length=500), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_product_styles_id', 'product_styles', ['id'])
+        op.create_index('ux_product_styles_name_category', 'product_styles', ['name', 'category'], unique=True)
+        op.create_index('ix_product_styles_category_id', 'product_styles', ['category', 'id'])
+
+    if not _has_column('products', 'style_id'):
+        with op.batch_alter_table('products') as batch:
+            batch.add_column(sa.Column('style_id', sa.Integer(), nullable=True))
+            batch.create_foreign_key('fk_products_style_id', 'product_styles', ['style_id'], ['id'])
+        op.create_index('ix_products_style_id', 'products', ['style_id'])
+
+    # One style per (name, category), seeded from the group's oldest product
+    op.execute(
+        """
+        INSERT INTO product_styles (name, category, description, price, image_url, created_at)
+        SELECT p.name, p.category, p.description, p.price, p.image_url, p.created_at
+        FROM products p
+        WHERE p.id IN (SELECT MIN(id) FROM products GROUP BY name, category)
+          AND NOT EXISTS (
+            SELECT 1 FROM product_styles s WHERE s.name = p.name AND s.category = p.category
+          )
+        """
+    )
+    op.execute(
+        """
+        UPDATE products SET style_id = (
+            SELECT s.id FROM product_styles s
+            WHERE s.name = products.name AND s.category = products.category
+        )
+        WHERE style_id IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_style_id', table_name='products')
+    with op.batch_alter_table('products') as batch:
+        batch.drop_constraint('fk_products_style_id', type_='foreignkey')
+        batch.drop_column('style_id')
+    op.drop_index('ix_product_styles_category_id', table_name='product_styles')
+    op.drop_index('ux_product_styles_name_category', table_name='product_styles')
+    op.drop_index('ix_product_styles_id', table_name='product_styles')
+    op.drop_table('product_styles')
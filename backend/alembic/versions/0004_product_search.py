@@ -0,0 +1,63 @@
+"""Full-text search index over product name and description
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:30:00.000000
+
+SQLite: an FTS5 external-content table products_fts, filled from the
+existing rows and kept in sync by triggers on products.
+PostgreSQL: a generated tsvector column products.search_vector (name
+weighted A, description B) with a GIN index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core import search
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The DDL is shared with Base.metadata.create_all so the two cannot drift
+SQLITE_UPGRADE = [
+    *search.SQLITE_DDL,
+    f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS products_fts_update",
+    "DROP TRIGGER IF EXISTS products_fts_delete",
+    "DROP TRIGGER IF EXISTS products_fts_insert",
+    f"DROP TABLE IF EXISTS {search.FTS_TABLE}",
+]
+
+POSTGRES_UPGRADE = search.POSTGRES_DDL
+
+POSTGRES_DOWNGRADE = [
+    f"DROP INDEX IF EXISTS {search.SEARCH_VECTOR_INDEX}",
+    f"ALTER TABLE products DROP COLUMN IF EXISTS {search.SEARCH_VECTOR_COLUMN}",
+]
+
+
+def _statements(sqlite, postgresql):
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgresql
+    raise NotImplementedError(f"product search is not supported on {dialect}")
+
+
+def upgrade() -> None:
+    for statement in _statements(SQLITE_UPGRADE, POSTGRES_UPGRADE):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in _statements(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE):
+        op.execute(statement)
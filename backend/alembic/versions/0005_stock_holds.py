@@ -0,0 +1,57 @@
+"""Time-limited stock holds for carts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 11:00:00.000000
+
+products.reserved counts the units held by active holds, so available
+stock is stock - reserved without summing stock_holds on every check.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_column(table: str, column: str) -> bool:
+    return any(info['name'] == column for info in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def upgrade() -> None:
+    if not _has_column('products', 'reserved'):
+        # A constant default lets SQLite add the column in place, keeping the search triggers
+        op.add_column('products', sa.Column('reserved', sa.Integer(), nullable=False, server_default='0'))
+
+    if not _has_table('stock_holds'):
+        op.create_table(
+            'stock_holds',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ux_stock_holds_user_id_product_id', 'stock_holds', ['user_id', 'product_id'], unique=True)
+        op.create_index('ix_stock_holds_expires_at', 'stock_holds', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_holds_expires_at', table_name='stock_holds')
+    op.drop_index('ux_stock_holds_user_id_product_id', table_name='stock_holds')
+    op.drop_table('stock_holds')
+    # In place (SQLite 3.35+): a batch table rebuild would drop the search triggers
+    op.drop_column('products', 'reserved')
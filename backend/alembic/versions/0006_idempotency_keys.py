@@ -0,0 +1,49 @@
+"""Idempotency keys for client retries
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 11:30:00.000000
+
+Stores the response of each POST made with an Idempotency-Key header so a
+retried request replays it. Rows older than IDEMPOTENCY_KEY_TTL are purged
+by the application.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _has_table('idempotency_keys'):
+        op.create_table(
+            'idempotency_keys',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('key', sa.String(length=255), nullable=False),
+            sa.Column('fingerprint', sa.String(length=64), nullable=False),
+            sa.Column('status_code', sa.Integer(), nullable=False),
+            sa.Column('response_body', sa.LargeBinary(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ux_idempotency_keys_user_id_key', 'idempotency_keys', ['user_id', 'key'], unique=True)
+        op.create_index('ix_idempotency_keys_created_at', 'idempotency_keys', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotency_keys_created_at', table_name='idempotency_keys')
+    op.drop_index('ux_idempotency_keys_user_id_key', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,45 @@
+"""Transactional outbox for post-order side effects
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 12:00:00.000000
+
+Events are written in the same transaction as the change they describe and
+drained by the outbox dispatcher; see app/core/outbox.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _has_table('outbox_events'):
+        op.create_table(
+            'outbox_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('topic', sa.String(length=100), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_outbox_events_available_at', 'outbox_events', ['available_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_available_at', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -1,52 +1,183 @@
-import requests as req
-from google.oauth2 import id_token
-from google.auth.transport import requests
+import asyncio
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
 from fastapi import HTTPException, status
+from jose import jwt as jose_jwt
 from app.core.config import settings
-from google.auth import jwt as auth_jwt
+
+# httpx and google.auth are imported on first use: they add noticeably to
+# worker boot time and are only needed once someone signs in with Google
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
 
 # Key URLs
 FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
 GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+_http_client: Optional["httpx.AsyncClient"] = None
+
 
-def verify_google_token(token: str) -> dict:
+def get_http_client() -> "httpx.AsyncClient":
+    """Shared pooled client for outbound calls to Google"""
+    import httpx
+    
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.GOOGLE_HTTP_TIMEOUT),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+class CertificateStore:
     """
-    Verify Google or Firebase OAuth token and return user info.
-    Tries both standard Google and Firebase certificates.
+    Process-wide cache of Google and Firebase signing certificates, indexed by kid.
+    Each source is cached for the max-age Google sends in Cache-Control and is
+    refreshed in the background shortly before it expires.
     """
-    print(f"DEBUG: Verifying token (first 10 chars): {token[:10]}...")
-    idinfo = None
-    firebase_project_id = "aurafashions-844d1"
+
+    def __init__(self, urls: Tuple[str, ...], default_max_age: int = 3600):
+        self.urls = urls
+        self.default_max_age = default_max_age
+        self._keys: Dict[str, Tuple[str, str]] = {}
+        self._sources: Dict[str, Dict[str, str]] = {url: {} for url in urls}
+        self._expires_at: Dict[str, float] = {url: 0.0 for url in urls}
+        self._last_forced_refresh = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, kid: str) -> Optional[str]:
+        """Return the PEM certificate for `kid` if it is cached and fresh"""
+        entry = self._keys.get(kid)
+        if entry is None:
+            return None
+        cert, url = entry
+        if time.monotonic() >= self._expires_at[url]:
+            return None
+        return cert
+
+    async def get_or_fetch(self, kid: str) -> Optional[str]:
+        """
+        Return the certificate for `kid`. Only a cold or expired cache, or an
+        unknown kid (key rotation, at most once per interval), hits the network.
+        """
+        cert = self.get(kid)
+        if cert is not None:
+            return cert
+
+        self.start()  # keep the keys warm from the first sign-in on
+        if kid in self._keys:
+            await self.refresh(only_expired=True)
+        else:
+            now = time.monotonic()
+            if now - self._last_forced_refresh < settings.GOOGLE_CERTS_MIN_REFRESH_INTERVAL:
+                return None
+            self._last_forced_refresh = now
+            await self.refresh()
+        return self.get(kid)
+
+    async def refresh(self, only_expired: bool = False) -> None:
+        """Fetch certificates from every source (or only the expired ones)"""
+        async with self._lock:
+            now = time.monotonic()
+            urls = [url for url in self.urls if not only_expired or now >= self._expires_at[url]]
+            results = await asyncio.gather(*(self._fetch(url) for url in urls), return_exceptions=True)
+            for url, result in zip(urls, results):
+                if isinstance(result, Exception):
+                    logger.warning("Failed to fetch certificates from %s: %s", url, result)
+                    continue
+                certs, max_age = result
+                self._sources[url] = certs
+                self._expires_at[url] = time.monotonic() + max_age
+            self._keys = {
+                kid: (cert, url)
+                for url, certs in self._sources.items()
+                for kid, cert in certs.items()
+            }
+
+    async def _fetch(self, url: str) -> Tuple[Dict[str, str], int]:
+        response = await get_http_client().get(url)
+        response.raise_for_status()
+        match = MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else self.default_max_age
+        return response.json(), max_age
+
+    def _next_refresh_in(self) -> float:
+        margin = settings.GOOGLE_CERTS_REFRESH_MARGIN
+        delay = min(self._expires_at.values()) - time.monotonic() - margin
+        return max(delay, settings.GOOGLE_CERTS_MIN_REFRESH_INTERVAL)
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self._next_refresh_in())
+
+    def start(self) -> None:
+        """Start the background refresh loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+certificate_store = CertificateStore((GOOGLE_CERTS_URL, FIREBASE_CERTS_URL))
+
+
+async def shutdown() -> None:
+    global _http_client
+    await certificate_store.stop()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _verify_id_token(token: str) -> Optional[dict]:
+    """Verify a Google/Firebase ID token against the cached key for its kid"""
+    from google.auth import jwt as auth_jwt
     
+    try:
+        kid = jose_jwt.get_unverified_header(token).get("kid")
+    except Exception:
+        return None
+    if not kid:
+        return None
+
+    cert = await certificate_store.get_or_fetch(kid)
+    if cert is None:
+        return None
+
     # List of possible audiences (Google Client ID and Firebase Project ID)
-    audiences = [settings.GOOGLE_CLIENT_ID, firebase_project_id]
+    audiences = [settings.GOOGLE_CLIENT_ID, settings.FIREBASE_PROJECT_ID]
+    try:
+        return auth_jwt.decode(token, certs={kid: cert}, audience=audiences)
+    except Exception:
+        return None
+
+
+async def verify_google_token(token: str) -> dict:
+    """
+    Verify Google or Firebase OAuth token and return user info.
+    The signing key is picked from the token header's kid.
+    """
+    import httpx
     
-    # List of certificate sources to try
-    cert_urls = [GOOGLE_CERTS_URL, FIREBASE_CERTS_URL]
-
-    # Try every combination of certificates and audiences until one works
-    for cert_url in cert_urls:
-        try:
-            # Fetch certs for this attempt
-            certs_resp = req.get(cert_url)
-            certs = certs_resp.json()
-            
-            # Try to decode with current certs
-            # We first check if the audience in the token is something we expect
-            unverified_claims = auth_jwt.decode(token, verify=False)
-            token_aud = unverified_claims.get('aud')
-            
-            if token_aud in audiences:
-                # Verify using the specific certs and the audience from the token
-                idinfo = auth_jwt.decode(
-                    token, 
-                    certs=certs, 
-                    audience=token_aud
-                )
-                if idinfo:
-                    break
-        except Exception:
-            continue
+    idinfo = await _verify_id_token(token)
 
     if idinfo:
         return {
@@ -55,11 +186,11 @@ def verify_google_token(token: str) -> dict:
             "picture": idinfo.get("picture"),
             "google_id": idinfo.get("sub")
         }
-    
+
     # Final fallback: Access Token check
     try:
-        response = req.get(
-            'https://www.googleapis.com/oauth2/v3/userinfo',
+        response = await get_http_client().get(
+            GOOGLE_USERINFO_URL,
             headers={'Authorization': f'Bearer {token}'}
         )
         if response.status_code == 200:
@@ -70,7 +201,7 @@ def verify_google_token(token: str) -> dict:
                 "picture": userinfo.get("picture"),
                 "google_id": userinfo.get("sub")
             }
-    except Exception:
+    except httpx.HTTPError:
         pass
 
     raise HTTPException(
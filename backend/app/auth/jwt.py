@@ -1,16 +1,93 @@
+import hashlib
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.database import get_db
+from app.core.cache import TTLCache
 from app.models import User
 
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated identity, detached from any DB session"""
+    id: int
+    email: str
+    name: str
+    role: str
+    picture: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            picture=user.picture,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """
+    Bounded TTL cache of (claims, principal) keyed by a hash of the bearer token,
+    so authenticated requests skip JWT decoding and the user lookup.
+    Entries never outlive the token's own expiry.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._forget)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[dict, Principal]]:
+        return self._cache.get(self.key(token))
+
+    def set(self, token: str, claims: dict, principal: Principal) -> None:
+        key = self.key(token)
+        ttl = claims.get("exp", 0) - time.time() if "exp" in claims else None
+        if ttl is not None and ttl <= 0:
+            return
+        self._tokens_by_user.setdefault(principal.id, set()).add(key)
+        self._cache.set(key, (claims, principal), ttl=ttl)
+
+    def _forget(self, key: str, entry: Tuple[dict, Principal]) -> None:
+        """Keep the user index in step with tokens the cache evicts or expires"""
+        user_id = entry[1].id
+        keys = self._tokens_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget every cached token of a user whose role or profile changed"""
+        for key in self._tokens_by_user.pop(user_id, ()):
+            self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._tokens_by_user.clear()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -38,10 +115,14 @@ def verify_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
     """Get current authenticated user from JWT token"""
     token = credentials.credentials
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
     payload = verify_token(token)
     
     user_id = payload.get("sub")
@@ -51,17 +132,19 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(token, payload, principal)
+    return principal
 
 
-async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get current user and verify they are an admin"""
     if current_user.role != "admin":
         raise HTTPException(
@@ -74,20 +157,15 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
 # Optional auth dependency - returns None if not authenticated
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Principal]:
     """Get current user if authenticated, otherwise return None"""
     if credentials is None:
         return None
     
     try:
-        token = credentials.credentials
-        payload = verify_token(token)
-        user_id = payload.get("sub")
-        if user_id:
-            return db.query(User).filter(User.id == int(user_id)).first()
-    except:
+        return await get_current_user(credentials, db)
+    except (HTTPException, ValueError):
         pass
     
     return None
-
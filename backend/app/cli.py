@@ -0,0 +1,63 @@
+"""
+Operational commands, run from the backend directory:
+
+    python -m app.cli migrate          # apply Alembic migrations up to head
+    python -m app.cli create-tables    # create missing tables directly (local SQLite/dev)
+    python -m app.cli outbox           # deliver outbox events in this process (Ctrl+C to stop)
+
+Run `migrate` once per deploy, before starting the workers. Run `outbox` as
+its own service to take event delivery off the API workers, with
+OUTBOX_DISPATCHER_ENABLED=false set for the workers.
+"""
+import argparse
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def migrate() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+
+
+def create_tables() -> None:
+    from app.database import Base, sync_engine
+    import app.models  # noqa: F401 - register the tables on Base.metadata
+
+    Base.metadata.create_all(bind=sync_engine)
+
+
+def outbox() -> None:
+    import asyncio
+    import logging
+    from app.core.outbox import outbox_dispatcher
+    import app.events  # noqa: F401 - register the event handlers
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(outbox_dispatcher.run_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+COMMANDS = {
+    "migrate": migrate,
+    "create-tables": create_tables,
+    "outbox": outbox,
+}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Catalog versioning and HTTP conditional GET helpers for product reads.
+
+Every product or stock write bumps a version stored in the `catalog_state`
+row inside the writer's transaction. Readers cache that version in-process
+for CATALOG_VERSION_TTL seconds, so ETag checks and 304 responses normally
+run without touching the database or re-serializing products.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import CatalogState
+
+CATALOG_STATE_ID = 1
+_CHANGED_FLAG = "catalog_changed"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    updated_at: datetime
+
+
+class CatalogVersion:
+    """
+    Process-local view of the catalog version, re-read at most once per TTL.
+    Kept per engine, so a replica's version always describes the rows read
+    from that replica.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshots: Dict[Any, Tuple[CatalogSnapshot, float]] = {}
+
+    async def current(self, db: AsyncSession) -> CatalogSnapshot:
+        cached = self._snapshots.get(db.bind)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+
+        row = (await db.execute(
+            select(CatalogState.version, CatalogState.updated_at)
+            .where(CatalogState.id == CATALOG_STATE_ID)
+        )).first()
+        if row is None:
+            snapshot = CatalogSnapshot(version=0, updated_at=datetime(1970, 1, 1, tzinfo=timezone.utc))
+        else:
+            updated_at = row.updated_at
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            snapshot = CatalogSnapshot(version=row.version, updated_at=updated_at)
+
+        self._snapshots[db.bind] = (snapshot, time.monotonic())
+        return snapshot
+
+    async def bump(self, db: AsyncSession) -> None:
+        """Increment the version within the caller's transaction"""
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            update(CatalogState)
+            .where(CatalogState.id == CATALOG_STATE_ID)
+            .values(version=CatalogState.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            await db.execute(
+                insert(CatalogState).values(id=CATALOG_STATE_ID, version=1, updated_at=now)
+            )
+        db.info[_CHANGED_FLAG] = True
+
+    def invalidate(self) -> None:
+        self._snapshots.clear()
+
+
+catalog_version = CatalogVersion(ttl=settings.CATALOG_VERSION_TTL)
+
+# Serialized response bodies keyed by ETag
+catalog_bodies = TTLCache(maxsize=settings.CATALOG_BODY_CACHE_SIZE, ttl=3600)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Forget the cached version once a bump is committed so this worker sees it immediately
+    if session.info.pop(_CHANGED_FLAG, False):
+        catalog_version.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_FLAG, None)
+
+
+def make_etag(snapshot: CatalogSnapshot, *parts) -> str:
+    """Strong ETag for a representation derived from the catalog at `snapshot`"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'"c{snapshot.version}-{digest}"'
+
+
+def cache_headers(etag: str, snapshot: CatalogSnapshot) -> dict:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(snapshot.updated_at.replace(microsecond=0), usegmt=True),
+        "Cache-Control": settings.CATALOG_CACHE_CONTROL,
+    }
+
+
+def is_not_modified(request: Request, etag: str, snapshot: CatalogSnapshot) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the catalog"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: compressed responses carry the W/ form of the same tag
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return snapshot.updated_at.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,151 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Brotli is used when the optional `brotli` package is installed and the
+client accepts it, gzip otherwise. Only complete (non-streamed) text and
+JSON bodies of at least COMPRESSION_MINIMUM_SIZE bytes are compressed.
+Compressed bodies of responses carrying an ETag are cached, so a catalog
+page served from the body cache is also compressed only once.
+"""
+import gzip
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# (ETag, coding) -> compressed body
+compressed_bodies = TTLCache(maxsize=settings.CATALOG_BODY_CACHE_SIZE, ttl=3600)
+
+
+def available_codings() -> tuple:
+    """Supported codings in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The preferred coding acceptable to the client, or None for identity"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    for coding in available_codings():
+        if weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing buffered response bodies"""
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        coding = negotiate(accept_encoding) if accept_encoding else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # Streamed response: leave it alone
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            await self._send_compressed(send, start_message, body, coding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_compressed(self, send, start_message, body: bytes, coding: str) -> None:
+        headers = list(start_message.get("headers", ()))
+        header_values = {name.lower(): value for name, value in headers}
+        content_type = header_values.get(b"content-type", b"").decode("latin-1")
+        if (
+            len(body) < self.minimum_size
+            or b"content-encoding" in header_values
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = header_values.get(b"etag")
+        cache_key = (etag, coding) if etag and not etag.startswith(b"W/") else None
+        compressed = compressed_bodies.get(cache_key) if cache_key else None
+        if compressed is None:
+            compressed = compress(body, coding)
+            if cache_key:
+                compressed_bodies.set(cache_key, compressed)
+
+        rewritten = []
+        vary = None
+        for name, value in headers:
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"etag" and not value.startswith(b"W/"):
+                # The compressed bytes differ from the identity representation,
+                # so the validator is only weakly equivalent (as nginx does)
+                value = b"W/" + value
+            if lowered == b"vary":
+                vary = value
+                continue
+            rewritten.append((name, value))
+        rewritten += [
+            (b"content-encoding", coding.encode()),
+            (b"content-length", str(len(compressed)).encode()),
+            (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+        ]
+
+        await send({**start_message, "headers": rewritten})
+        await send({"type": "http.response.body", "body": compressed})
@@ -5,14 +5,87 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database (SQLite for local dev, PostgreSQL for production)
     DATABASE_URL: str = "sqlite:///./ekart.db"
+    # Connection pool, per worker process (ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True  # detect connections dropped by a failover
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # 0 disables
+    DB_PGBOUNCER: bool = False  # NullPool and no prepared statements, for PgBouncer transaction pooling
+    DB_CREATE_TABLES_ON_STARTUP: bool = False  # dev only; deployments run `python -m app.cli migrate`
+    
+    # Read replicas (comma-separated URLs; empty sends every read to the primary)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas lagging further are skipped
+    REPLICA_CHECK_INTERVAL: float = 5.0  # seconds between replica health/lag checks
+    READ_YOUR_WRITES_WINDOW: float = 10.0  # seconds a client reads from the primary after writing
+    
+    # Readiness probe
+    READY_DB_TIMEOUT: float = 2.0  # seconds allowed for the DB ping
+    READY_MAX_POOL_SATURATION: float = 0.9  # share of connections checked out before reporting not ready
     
     # JWT
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds an authenticated identity is reused
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000
     
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
+    FIREBASE_PROJECT_ID: str = "aurafashions-844d1"
+    GOOGLE_HTTP_TIMEOUT: float = 5.0
+    GOOGLE_CERTS_REFRESH_MARGIN: int = 300  # seconds before expiry to refresh certs
+    GOOGLE_CERTS_MIN_REFRESH_INTERVAL: int = 30  # seconds between refetches on unknown kids
+    
+    # Product catalog HTTP caching
+    CATALOG_VERSION_TTL: float = 1.0  # seconds a worker trusts its cached catalog version
+    CATALOG_BODY_CACHE_SIZE: int = 512
+    CATALOG_CACHE_CONTROL: str = "public, max-age=0, must-revalidate"
+    
+    # Response compression (brotli needs the optional `brotli` package, else gzip)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller bodies are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher is smaller but much slower
+    
+    # Cart stock reservations
+    RESERVATION_TTL: int = 900  # seconds a cart holds reserved units
+    RESERVATION_SWEEP_INTERVAL: float = 30.0  # seconds between releases of expired holds
+    RESERVATION_SWEEP_BATCH: int = 1000  # expired holds released per transaction
+    
+    # Idempotency-Key support (POST /orders)
+    IDEMPOTENCY_KEY_TTL: int = 86400  # seconds a key replays its stored response
+    IDEMPOTENCY_CACHE_SIZE: int = 10000  # stored responses kept in each worker's memory
+    IDEMPOTENCY_PURGE_INTERVAL: float = 600.0  # seconds between deletes of expired keys
+    
+    # Transactional outbox (post-checkout side effects)
+    OUTBOX_DISPATCHER_ENABLED: bool = True  # False when `python -m app.cli outbox` runs it as its own process
+    OUTBOX_POLL_INTERVAL: float = 1.0  # seconds between scans when no local commit wakes the dispatcher
+    OUTBOX_BATCH_SIZE: int = 100  # events claimed per scan
+    OUTBOX_LEASE: float = 60.0  # seconds a claimed event is hidden from other dispatchers
+    OUTBOX_MAX_ATTEMPTS: int = 10  # then the event is parked for inspection
+    OUTBOX_RETRY_BASE: float = 2.0  # seconds before the first retry; doubles per attempt
+    OUTBOX_RETRY_MAX: float = 600.0  # longest delay between retries
+    
+    # Rate limiting: token buckets per user, or per client IP before login.
+    # Policies are "<requests>/<second|minute|hour>"; an empty policy disables the limit.
+    # Behind a proxy, set FORWARDED_ALLOW_IPS so the client IP is the caller's, not the proxy's.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per worker) or redis (shared by all workers)
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_AUTH_GOOGLE: str = "10/minute"  # per IP; each call may fetch Google's certs
+    RATE_LIMIT_AUTH_DEV_LOGIN: str = "30/minute"  # per IP
+    RATE_LIMIT_ORDERS_CREATE: str = "20/minute"  # per user
+    
+    # Bulk product import
+    PRODUCT_IMPORT_BATCH_SIZE: int = 1000  # rows per upsert transaction
+    PRODUCT_IMPORT_MAX_ERRORS: int = 1000  # row errors listed in the response
+    
+    # Observability
+    METRICS_ENABLED: bool = True  # serve Prometheus metrics at /metrics
+    QUERY_DEBUG: bool = False  # X-DB-Query-Count/-Time-Ms headers and N+1 warnings
+    QUERY_REPEAT_WARN_THRESHOLD: int = 3  # warn when one statement shape runs more often per request
     
     # CORS
     FRONTEND_URL: str = "http://localhost:5173"
@@ -0,0 +1,181 @@
+"""
+Idempotency-Key support for non-idempotent POSTs.
+
+A client sends the same Idempotency-Key header on every retry of one logical
+request. The first successful execution stores its response in
+idempotency_keys inside the request's own transaction, so the response and
+the changes it reports commit together. Later requests with the key get the
+stored response back (marked with Idempotency-Replayed) without the handler
+running again.
+
+Stored responses are looked up in a bounded in-memory cache before the
+table. A duplicate that reaches the same worker while the first execution is
+still running waits for it instead of racing it. Across workers the unique
+(user_id, key) index rejects the second commit, and that request replays the
+winner's response.
+
+Keys are scoped per user, and reusing a key with a different request body is
+an error. Failed requests store nothing and may be retried with the same key.
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.serialization import json_response
+from app.database import AsyncSessionLocal
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotency-Replayed"
+PURGE_BATCH = 1000
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+
+def fingerprint(payload: BaseModel) -> str:
+    """Digest of a validated request body, to detect a key reused for another request"""
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def _expired_before() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+class IdempotencyStore:
+    """
+    Runs a handler at most once per (user, key) and replays its response.
+    Expired keys are purged in the background every IDEMPOTENCY_PURGE_INTERVAL
+    seconds.
+    """
+
+    def __init__(self):
+        self._responses = TTLCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_KEY_TTL)
+        self._in_flight: Dict[Tuple[int, str], asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def save(self, db: AsyncSession, user_id: int, key: str, request_fingerprint: str,
+                   response: Response) -> None:
+        """Store a response in the caller's transaction; the caller commits"""
+        await db.execute(insert(IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            fingerprint=request_fingerprint,
+            status_code=response.status_code,
+            response_body=bytes(response.body),
+        ))
+
+    async def _load(self, db: AsyncSession, user_id: int, key: str) -> Optional[StoredResponse]:
+        row = (await db.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.response_body)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.created_at > _expired_before(),
+            )
+        )).first()
+        return StoredResponse(*row) if row else None
+
+    @staticmethod
+    def _replay(stored: StoredResponse, request_fingerprint: str) -> Response:
+        if stored.fingerprint != request_fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+            )
+        return json_response(stored.body, status_code=stored.status_code, headers={REPLAYED_HEADER: "true"})
+
+    async def run(self, db: AsyncSession, user_id: int, key: str, request_fingerprint: str,
+                  execute: Callable[[], Awaitable[Response]]) -> Response:
+        """
+        Replay the stored response for (user_id, key), or run `execute` once.
+        `execute` must call save() before it commits.
+        """
+        cache_key = (user_id, key)
+        while cache_key not in self._responses and cache_key in self._in_flight:
+            await self._in_flight[cache_key].wait()
+
+        stored = self._responses.get(cache_key)
+        if stored is not None:
+            return self._replay(stored, request_fingerprint)
+
+        # No await between the check above and this claim
+        done = self._in_flight[cache_key] = asyncio.Event()
+        try:
+            stored = await self._load(db, user_id, key)
+            if stored is None:
+                try:
+                    response = await execute()
+                except IntegrityError:
+                    # Another worker committed this key first
+                    await db.rollback()
+                    stored = await self._load(db, user_id, key)
+                    if stored is None:
+                        raise
+                else:
+                    self._responses.set(
+                        cache_key, StoredResponse(request_fingerprint, response.status_code, bytes(response.body))
+                    )
+                    return response
+            self._responses.set(cache_key, stored)
+            return self._replay(stored, request_fingerprint)
+        finally:
+            del self._in_flight[cache_key]
+            done.set()
+
+    async def purge_expired(self) -> int:
+        """Delete keys older than IDEMPOTENCY_KEY_TTL; returns how many were deleted"""
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                expired = (
+                    select(IdempotencyKey.id)
+                    .where(IdempotencyKey.created_at <= _expired_before())
+                    .limit(PURGE_BATCH)
+                )
+                deleted = (await db.execute(
+                    delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired.scalar_subquery()))
+                )).rowcount
+                await db.commit()
+            total += deleted
+            if deleted < PURGE_BATCH:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.purge_expired()
+            except Exception:
+                logger.exception("Idempotency key purge failed")
+            await asyncio.sleep(settings.IDEMPOTENCY_PURGE_INTERVAL)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+idempotency_keys = IdempotencyStore()
@@ -0,0 +1,88 @@
+"""
+Streaming record parsing for bulk uploads (NDJSON and CSV).
+
+Request bodies are consumed chunk by chunk, so an upload of any size is
+parsed with memory bounded by the longest record, not the whole file.
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json")
+CSV_TYPES = ("text/csv", "application/csv")
+
+# (line number, record or None, error message or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_format(content_type: str) -> Optional[str]:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    if media_type in CSV_TYPES:
+        return "csv"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    async for line_no, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Each line must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """CSV with a header row; quoted fields may span lines. Empty cells become None."""
+    header = None
+    pending, start_line = [], 0
+    async for line_no, line in iter_lines(chunks):
+        if not pending:
+            start_line = line_no
+        pending.append(line)
+        text = "\n".join(pending)
+        if text.count('"') % 2:
+            continue  # inside a quoted field that continues on the next line
+        pending = []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start_line, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start_line, {key: (value if value != "" else None) for key, value in zip(header, values)}, None
+
+    if pending:
+        yield start_line, None, "Unterminated quoted field"
+
+
+def iter_records(fmt: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    return iter_ndjson(chunks) if fmt == "ndjson" else iter_csv(chunks)
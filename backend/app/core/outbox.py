@@ -0,0 +1,205 @@
+"""
+Transactional outbox for side effects of committed changes.
+
+Work that follows a change (confirmation emails, analytics, inventory sync)
+is recorded with publish() as an outbox_events row in the same transaction
+as the change: the request pays for one INSERT, and the event exists if and
+only if the change committed. The OutboxDispatcher then delivers events to
+the handlers registered for their topic, outside any request.
+
+Delivery is at least once: an event is deleted only after all of its
+handlers succeeded, so handlers must tolerate repeats (key on the ids in the
+payload). A failed event is retried after OUTBOX_RETRY_BASE * 2^(attempt-1)
+seconds with jitter, capped at OUTBOX_RETRY_MAX, and parked with its last
+error after OUTBOX_MAX_ATTEMPTS.
+
+A dispatcher claims a batch by moving its available_at OUTBOX_LEASE seconds
+ahead, so dispatchers in every worker (or a separate `python -m app.cli
+outbox` process) can drain the table together, and a batch held by a
+dispatcher that died is picked up again when its lease runs out.
+"""
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.database import AsyncSessionLocal
+from app.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+OUTBOX_PENDING = registry.gauge("outbox_pending_events", "Outbox events waiting for delivery, including retries")
+OUTBOX_PARKED = registry.gauge("outbox_parked_events", "Outbox events that used up their delivery attempts")
+OUTBOX_OLDEST_AGE = registry.gauge(
+    "outbox_oldest_pending_age_seconds", "Age of the oldest outbox event waiting for delivery"
+)
+OUTBOX_DELIVERED = registry.counter("outbox_events_delivered_total", "Outbox events delivered", ("topic",))
+OUTBOX_FAILURES = registry.counter("outbox_delivery_failures_total", "Failed outbox delivery attempts", ("topic",))
+
+_handlers: Dict[str, List[Handler]] = defaultdict(list)
+
+
+def handler(topic: str) -> Callable[[Handler], Handler]:
+    """Register an async function to receive the payload of every event on `topic`"""
+    def register(function: Handler) -> Handler:
+        _handlers[topic].append(function)
+        return function
+    return register
+
+
+async def publish(db: AsyncSession, topic: str, payload: dict) -> None:
+    """Record an event in the caller's transaction; the caller commits"""
+    await db.execute(insert(OutboxEvent).values(topic=topic, payload=payload))
+
+
+def _retry_at(attempts: int) -> Optional[datetime]:
+    """When to try again after `attempts` failed deliveries; None parks the event"""
+    if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        return None
+    delay = min(settings.OUTBOX_RETRY_BASE * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX)
+    return datetime.now(timezone.utc) + timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class OutboxDispatcher:
+    """
+    Drains outbox_events in batches of OUTBOX_BATCH_SIZE. It scans every
+    OUTBOX_POLL_INTERVAL seconds, or at once when notify() reports a local
+    commit, and refreshes the queue-depth gauges after each scan.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Wake the dispatcher: an event was just committed"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim(self) -> list:
+        now = datetime.now(timezone.utc)
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.available_at)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            # Re-checking available_at keeps a concurrent dispatcher from claiming the same rows
+            events = (await db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(due.scalar_subquery()), OutboxEvent.available_at <= now)
+                .values(
+                    available_at=now + timedelta(seconds=settings.OUTBOX_LEASE),
+                    attempts=OutboxEvent.attempts + 1,
+                )
+                .returning(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload, OutboxEvent.attempts)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+        return events
+
+    @staticmethod
+    async def _deliver(event) -> Optional[str]:
+        """Run the event's handlers; returns the error, or None on success"""
+        try:
+            for handle in _handlers.get(event.topic, ()):
+                await handle(event.payload)
+        except Exception as exc:
+            logger.warning("Outbox event %s (%s) failed on attempt %d: %r", event.id, event.topic, event.attempts, exc)
+            return f"{exc.__class__.__name__}: {exc}"
+        return None
+
+    async def dispatch_batch(self) -> int:
+        """Claim and deliver one batch; returns how many events were claimed"""
+        events = await self._claim()
+        if not events:
+            return 0
+
+        # No connection is held while handlers run
+        errors = await asyncio.gather(*(self._deliver(event) for event in events))
+
+        async with AsyncSessionLocal() as db:
+            delivered = [event.id for event, error in zip(events, errors) if error is None]
+            if delivered:
+                await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(delivered)))
+            for event, error in zip(events, errors):
+                if error is None:
+                    OUTBOX_DELIVERED.inc((event.topic,))
+                    continue
+                OUTBOX_FAILURES.inc((event.topic,))
+                retry_at = _retry_at(event.attempts)
+                if retry_at is None:
+                    logger.error("Outbox event %s (%s) parked after %d attempts", event.id, event.topic, event.attempts)
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == event.id)
+                    .values(available_at=retry_at, last_error=error[:1000])
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        return len(events)
+
+    async def measure(self) -> None:
+        """Refresh the queue-depth gauges"""
+        async with AsyncSessionLocal() as db:
+            pending, total, oldest = (await db.execute(select(
+                func.count(OutboxEvent.available_at),
+                func.count(),
+                func.min(case((OutboxEvent.available_at.is_not(None), OutboxEvent.created_at))),
+            ))).one()
+        OUTBOX_PENDING.set(pending)
+        OUTBOX_PARKED.set(total - pending)
+        if oldest is None:
+            OUTBOX_OLDEST_AGE.set(0)
+        else:
+            if oldest.tzinfo is None:  # SQLite
+                oldest = oldest.replace(tzinfo=timezone.utc)
+            OUTBOX_OLDEST_AGE.set(max((datetime.now(timezone.utc) - oldest).total_seconds(), 0))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self.dispatch_batch() >= settings.OUTBOX_BATCH_SIZE:
+                    pass
+                await self.measure()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_forever(self) -> None:
+        """Dispatch in the foreground (`python -m app.cli outbox`)"""
+        self._wakeup = asyncio.Event()
+        await self._run()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+
+
+outbox_dispatcher = OutboxDispatcher()
@@ -0,0 +1,146 @@
+"""
+Per-request SQL statement accounting.
+
+Every statement executed on an instrumented engine is counted against the
+trackers active in the current context (one per request, plus any test
+budgets). Statements are grouped by shape - the SQL text with bind
+placeholders and IN-lists collapsed - so a loop issuing the same query
+per row (an N+1) shows up as one shape with a high count.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = r"(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_PLACEHOLDER_SINGLE = re.compile(_PLACEHOLDER)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize SQL so statements differing only in bound values compare equal"""
+    shape = _PLACEHOLDER_LIST.sub("(?)", statement)
+    shape = _PLACEHOLDER_SINGLE.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_active: ContextVar[Tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count statements executed in this context (nested trackers all see them)"""
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "block") -> Iterator[QueryStats]:
+    """
+    Fail if more than `limit` statements run inside the block.
+
+        with assert_max_queries(3, "GET /orders/my"):
+            await client.get("/orders/my", headers=auth)
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        shapes = "\n".join(f"  {count}x {shape}" for shape, count in stats.shapes.most_common())
+        raise QueryBudgetExceeded(f"{label}: {stats.count} queries, budget {limit}\n{shapes}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    trackers = _active.get()
+    if not trackers:
+        return
+    shape = statement_shape(statement)
+    for stats in trackers:
+        stats.count += 1
+        stats.duration += elapsed
+        stats.shapes[shape] += 1
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    started = connection.info.get("query_started") if connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Attach the statement counters to `engine` (sync or async)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryDebugMiddleware:
+    """
+    Debug aid: report each request's query count and DB time in response
+    headers and log statement shapes that repeat within one request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": [
+                        *message.get("headers", ()),
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-query-time-ms", f"{stats.duration * 1000:.2f}".encode()),
+                    ]}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for shape, count in stats.repeated(settings.QUERY_REPEAT_WARN_THRESHOLD):
+            logger.warning(
+                "%s %s ran the same statement %d times (possible N+1): %s",
+                scope["method"], scope["path"], count, shape,
+            )
@@ -0,0 +1,180 @@
+"""
+Token-bucket rate limiting for expensive or abusable routes.
+
+Each policy ("10/minute") is a bucket holding up to that many requests and
+refilling at that rate, kept per user for authenticated routes and per
+client IP otherwise. A request that finds the bucket empty gets 429 with a
+Retry-After header saying when the next token arrives.
+
+Buckets live in worker memory by default, so every gunicorn worker enforces
+the limit separately. RATE_LIMIT_BACKEND=redis keeps them in a shared Redis
+(or any server speaking its protocol, such as a local redis-server or
+Valkey stand-in) and updates them atomically in a Lua script; it needs the
+optional `redis` package. If the shared store cannot be reached, requests
+are let through and a warning is logged.
+"""
+import logging
+import math
+import re
+import time
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = registry.counter("rate_limited_requests_total", "Requests rejected by a rate limit", ("policy",))
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+_POLICY = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour)\s*$")
+
+# Refill the bucket, take a token if there is one, and return the wait for
+# the next token (0 when allowed). Time comes from the server so every worker
+# sees the same clock.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RatePolicy(NamedTuple):
+    capacity: int  # requests allowed in a burst
+    rate: float  # tokens added per second
+
+
+@lru_cache(maxsize=None)
+def parse_policy(value: str) -> Optional[RatePolicy]:
+    """"20/minute" -> RatePolicy(20, 0.333); an empty value disables the limit"""
+    if not value.strip():
+        return None
+    match = _POLICY.match(value)
+    if not match:
+        raise ValueError(f"Invalid rate limit policy {value!r}; expected e.g. '20/minute'")
+    count, period = int(match.group(1)), match.group(2)
+    return RatePolicy(capacity=count, rate=count / PERIODS[period])
+
+
+class MemoryBackend:
+    """Buckets in this worker's memory; a full bucket is dropped once it would be refilled"""
+
+    def __init__(self, maxsize: int = 100_000):
+        self._buckets = TTLCache(maxsize=maxsize, ttl=PERIODS["hour"])
+
+    async def take(self, key: str, policy: RatePolicy) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (policy.capacity, now))
+        tokens = min(policy.capacity, tokens + (now - updated) * policy.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / policy.rate
+        self._buckets.set(key, (tokens, now), ttl=(policy.capacity - tokens) / policy.rate + 1)
+        return wait
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+
+class RedisBackend:
+    """Buckets in Redis, shared by every worker and host using the same URL"""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError:  # optional dependency
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the `redis` package") from None
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, policy: RatePolicy) -> float:
+        return float(await self._script(keys=[f"ratelimit:{key}"], args=[policy.rate, policy.capacity]))
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+BACKENDS = {"memory": lambda: MemoryBackend(), "redis": lambda: RedisBackend(settings.RATE_LIMIT_REDIS_URL)}
+
+
+class RateLimiter:
+    def __init__(self):
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.RATE_LIMIT_BACKEND not in BACKENDS:
+                raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND {settings.RATE_LIMIT_BACKEND!r}")
+            self._backend = BACKENDS[settings.RATE_LIMIT_BACKEND]()
+        return self._backend
+
+    async def check(self, name: str, key: str) -> None:
+        """Take a token from `key`'s bucket for policy `name`, or raise 429"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        policy = parse_policy(getattr(settings, f"RATE_LIMIT_{name.upper()}"))
+        if policy is None:
+            return
+        try:
+            wait = await self.backend.take(f"{name}:{key}", policy)
+        except Exception as exc:
+            # Fail open: an unreachable limiter must not take the routes down with it
+            logger.warning("Rate limiter unavailable for %s, request allowed: %r", name, exc)
+            return
+        if wait > 0:
+            RATE_LIMITED.inc((name,))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    async def close(self) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+
+rate_limiter = RateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    # Proxy headers are applied by the server (uvicorn/gunicorn FORWARDED_ALLOW_IPS)
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(name: str):
+    """Route dependency enforcing policy RATE_LIMIT_<NAME> per client IP"""
+    async def dependency(request: Request) -> None:
+        await rate_limiter.check(name, f"ip:{client_ip(request)}")
+    return Depends(dependency)
+
+
+async def limit_user(name: str, user_id: int) -> None:
+    """
+    Enforce policy RATE_LIMIT_<NAME> for a user, or raise 429. Called from the
+    handler rather than as a dependency, so it runs only once the request is
+    known to do work (e.g. not for an idempotent replay).
+    """
+    await rate_limiter.check(name, f"user:{user_id}")
@@ -0,0 +1,140 @@
+"""
+Time-limited stock holds for carts.
+
+Adding a product to the cart holds its units for RESERVATION_TTL seconds:
+the hold is a stock_holds row and its quantity is counted in
+products.reserved, so every availability check is stock - reserved on a
+single row. Checkout converts the buyer's holds into the stock decrement
+in the same statement, and the sweeper returns expired holds to the pool.
+
+Product reads show available units, so taking or releasing a hold bumps
+the catalog version like any other stock write. The guarded UPDATEs, not
+those reads, are what enforce availability.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalog import catalog_version
+from app.core.config import settings
+from app.core.metrics import registry
+from app.database import AsyncSessionLocal
+from app.models import Product, StockHold
+
+logger = logging.getLogger(__name__)
+
+HOLDS_EXPIRED = registry.counter("stock_holds_expired_total", "Expired cart holds released by the sweeper")
+
+
+def hold_expiry() -> datetime:
+    # Rounded up to whole seconds, as SQLite stores them, so a hold never lasts less than the TTL
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.RESERVATION_TTL)
+    if expires_at.microsecond:
+        expires_at = expires_at.replace(microsecond=0) + timedelta(seconds=1)
+    return expires_at
+
+
+async def release_holds(db: AsyncSession, *conditions) -> int:
+    """
+    Delete the holds matching `conditions`, give their units back and bump
+    the catalog version. Returns the number of holds released; the caller commits.
+    """
+    rows = (await db.execute(
+        delete(StockHold).where(*conditions).returning(StockHold.product_id, StockHold.quantity)
+    )).all()
+    
+    released = defaultdict(int)
+    for product_id, quantity in rows:
+        released[product_id] += quantity
+    if released:
+        await db.execute(
+            update(Product)
+            .where(Product.id.in_(released))
+            .values(reserved=Product.reserved - case(released, value=Product.id))
+            .execution_options(synchronize_session=False)
+        )
+        await catalog_version.bump(db)
+    return len(rows)
+
+
+async def claim_holds(db: AsyncSession, user_id: int, product_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Delete a user's holds on the given products, expired or not, and return
+    their quantities. The units stay counted in products.reserved: the caller
+    moves them in its own guarded UPDATE.
+    """
+    rows = await db.execute(
+        delete(StockHold)
+        .where(StockHold.user_id == user_id, StockHold.product_id.in_(list(product_ids)))
+        .returning(StockHold.product_id, StockHold.quantity)
+    )
+    return dict(rows.all())
+
+
+def expired_holds_query(now: datetime, limit: int):
+    """Ids of holds expired at `now`, oldest first (served by ix_stock_holds_expires_at)"""
+    return (
+        select(StockHold.id)
+        .where(StockHold.expires_at <= now)
+        .order_by(StockHold.expires_at)
+        .limit(limit)
+    )
+
+
+async def release_expired(db: AsyncSession) -> int:
+    """Release one batch of expired holds; returns how many were released"""
+    expired = expired_holds_query(datetime.now(timezone.utc), settings.RESERVATION_SWEEP_BATCH)
+    return await release_holds(db, StockHold.id.in_(expired.scalar_subquery()))
+
+
+class ReservationSweeper:
+    """
+    Releases expired holds every RESERVATION_SWEEP_INTERVAL seconds, in
+    batches of RESERVATION_SWEEP_BATCH per transaction. Every worker runs
+    one; DELETE ... RETURNING releases each hold exactly once.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep(self) -> int:
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                released = await release_expired(db)
+                await db.commit()
+            total += released
+            HOLDS_EXPIRED.inc(amount=released)
+            if released < settings.RESERVATION_SWEEP_BATCH:
+                return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                released = await self.sweep()
+                if released:
+                    logger.info("Released %d expired stock holds", released)
+            except Exception:
+                logger.exception("Stock hold sweep failed")
+            await asyncio.sleep(settings.RESERVATION_SWEEP_INTERVAL)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+reservation_sweeper = ReservationSweeper()
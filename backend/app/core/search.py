@@ -0,0 +1,98 @@
+"""
+Full-text product search over name and description.
+
+SQLite uses an FTS5 external-content table (`products_fts`) kept in sync
+with `products` by triggers; PostgreSQL uses a generated `search_vector`
+tsvector column with a GIN index. Either way the index follows every
+write to products, including bulk imports and raw SQL, without
+application code.
+
+Every query term is matched as a prefix ("hood" finds hoodies) and all
+terms must match. Matches are ranked with name hits weighted above
+description hits.
+"""
+import re
+from typing import List, Optional
+
+MAX_TERMS = 8
+NAME_WEIGHT = 10.0  # bm25 column weights (SQLite); PostgreSQL uses tsvector weights A/B
+DESCRIPTION_WEIGHT = 1.0
+FTS5_RANK = f"bm25({NAME_WEIGHT}, {DESCRIPTION_WEIGHT})"  # FTS5 `rank MATCH` ranking function
+POSTGRES_CONFIG = "english"
+
+FTS_TABLE = "products_fts"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEX = "ix_products_search_vector"
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    # Stock and price updates do not touch the index
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    f"""
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX} ON products USING gin ({SEARCH_VECTOR_COLUMN})",
+]
+
+
+def is_search_object(name: str, type_: str, table_name: Optional[str] = None) -> bool:
+    """
+    Whether a reflected schema object belongs to the search index. These are
+    created by DDL outside the models (FTS5 shadow tables, the generated
+    tsvector column and its index), so schema comparisons must skip them.
+    """
+    if type_ == "table":
+        return name == FTS_TABLE or name.startswith(f"{FTS_TABLE}_")
+    if type_ == "column":
+        return table_name == "products" and name == SEARCH_VECTOR_COLUMN
+    if type_ == "index":
+        return name == SEARCH_VECTOR_INDEX
+    return False
+
+
+_TERM = re.compile(r"\w+")
+
+
+def search_terms(query: str) -> List[str]:
+    """Lowercased word terms of a user query; punctuation and operators are dropped"""
+    return _TERM.findall(query.lower())[:MAX_TERMS]
+
+
+def fts5_match(terms: List[str]) -> str:
+    """FTS5 MATCH expression: every term, each as a quoted prefix"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    """to_tsquery() input: every term, each as a prefix"""
+    return " & ".join(f"{term}:*" for term in terms)
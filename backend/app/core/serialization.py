@@ -0,0 +1,49 @@
+"""
+Fast JSON serialization for read endpoints.
+
+Returning ORM objects with a `response_model` makes FastAPI validate every
+row through pydantic, dump the models back to Python primitives and encode
+those with the stdlib `json` module. List endpoints instead select
+only the columns of their response schema, build plain dicts from the
+rows and encode them once with orjson. Responses built from ORM objects
+go through a TypeAdapter compiled once per schema.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+# UTC datetimes end in "Z", matching pydantic's own JSON output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=ORJSON_OPTIONS)
+
+
+def json_response(body: bytes, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def projection(entity, schema: Type[BaseModel], exclude: Iterable[str] = ()) -> Tuple:
+    """Mapped columns of `entity` for the fields of `schema`, in schema order"""
+    excluded = set(exclude)
+    return tuple(getattr(entity, name) for name in schema.model_fields if name not in excluded)
+
+
+@lru_cache(maxsize=None)
+def adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump_model(schema, value: Any) -> bytes:
+    """Validate `value` (e.g. an ORM object) against `schema` and encode it as JSON"""
+    type_adapter = adapter(schema)
+    return type_adapter.dump_json(type_adapter.validate_python(value, from_attributes=True))
+
+
+def field_names(columns: Sequence) -> Tuple[str, ...]:
+    return tuple(column.key for column in columns)
+
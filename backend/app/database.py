@@ -1,28 +1,291 @@
-from sqlalchemy import create_engine
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+import time
+from typing import List, Optional
+from uuid import uuid4
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Async drivers used by the application engine
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize legacy postgres:// URLs (Heroku/Render style)"""
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its async counterpart"""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ASYNC_DRIVERS:
+        return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+    return url
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def async_engine_options(url: str, pool_name: str = "primary") -> dict:
+    """
+    Pool and driver options for the API engine, from Settings. `pool_name`
+    labels the pool's metrics and log lines.
+    """
+    dialect = url.split(":", 1)[0].split("+", 1)[0]
+    if dialect == "sqlite":
+        return {"connect_args": {"check_same_thread": False}, "pool_logging_name": pool_name}
+    
+    connect_args = {}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns the pooling; in transaction mode a server connection
+        # cannot hold prepared statements or startup parameters between
+        # transactions, so disable both and bound statements client-side
+        if dialect == "postgresql":
+            connect_args = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+            }
+            if settings.DB_STATEMENT_TIMEOUT_MS:
+                connect_args["command_timeout"] = settings.DB_STATEMENT_TIMEOUT_MS / 1000
+        return {"poolclass": NullPool, "connect_args": connect_args, "pool_logging_name": pool_name}
+    
+    if dialect == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool,  # records checkout wait for /metrics
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+        "pool_logging_name": pool_name,
+    }
+
 
 # Handle SQLite vs PostgreSQL connection args
-db_url = settings.DATABASE_URL
-if db_url and db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql://", 1)
+db_url = normalize_url(settings.DATABASE_URL)
+async_db_url = to_async_url(db_url)
 
 connect_args = {}
 if db_url.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(db_url, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async engine used by the API
+engine = create_async_engine(async_db_url, **async_engine_options(async_db_url))
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Sync engine for CLI scripts (seeding, migrations)
+sync_engine = create_engine(db_url, connect_args=connect_args, pool_pre_ping=True)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
 Base = declarative_base()
 
 
-def get_db():
+def pool_usage() -> Optional[dict]:
+    """Occupancy of the API engine's pool, or None when it does not pool (SQLite, PgBouncer)"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 1.0,
+    }
+
+
+async def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+
+# ============ Read replicas ============
+
+# Clients echo this header back so read-your-writes holds across workers
+PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until"
+
+REPLICA_LAG_SQL = {
+    # Seconds since the last replayed transaction; 0 on a server that is not in recovery
+    "postgresql": text(
+        "SELECT CASE WHEN pg_is_in_recovery() "
+        "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+        "ELSE 0 END"
+    ),
+}
+
+
+class Replica:
+    def __init__(self, url: str, pool_name: str):
+        async_url = to_async_url(normalize_url(url))
+        self.engine = create_async_engine(async_url, **async_engine_options(async_url, pool_name))
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        self.healthy = False  # until the first check passes
+        self.lag: Optional[float] = None
+
+
+class ReplicaSet:
+    """
+    Routes read-only sessions to healthy replicas (round robin) and falls back
+    to the primary when none qualify. A replica qualifies while its last
+    health check succeeded with lag under REPLICA_MAX_LAG_SECONDS; checks run
+    in the background every REPLICA_CHECK_INTERVAL seconds.
+    
+    Clients that just wrote are pinned to the primary for READ_YOUR_WRITES_WINDOW
+    seconds, in-process by bearer token and across workers through the signed
+    X-Read-Primary-Until header the client echoes back.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url, f"replica{number}") for number, url in enumerate(urls, 1)]
+        self._round_robin = itertools.count()
+        self._pins = TTLCache(maxsize=10000, ttl=settings.READ_YOUR_WRITES_WINDOW)
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _pin_key(request: Request) -> Optional[str]:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _sign(until: str) -> str:
+        return hmac.new(settings.SECRET_KEY.encode(), until.encode("latin-1"), hashlib.sha256).hexdigest()[:32]
+
+    def pin_to_primary(self, request: Request, response: Response) -> None:
+        """Send this client's reads to the primary for the read-your-writes window"""
+        until = time.time() + settings.READ_YOUR_WRITES_WINDOW
+        key = self._pin_key(request)
+        if key is not None:
+            self._pins.set(key, until)
+        # Signed so a client cannot pin itself to the primary with a forged, far-future value
+        stamp = f"{until:.3f}"
+        response.headers[PRIMARY_UNTIL_HEADER] = f"{stamp}:{self._sign(stamp)}"
+
+    def is_pinned(self, request: Request) -> bool:
+        stamp, _, signature = request.headers.get(PRIMARY_UNTIL_HEADER, "").partition(":")
+        # Only stamps this server issued verify, so none lies beyond the window.
+        # The header is client input: anything malformed just means "not pinned".
+        try:
+            if (
+                signature
+                and hmac.compare_digest(signature.encode("latin-1"), self._sign(stamp).encode())
+                and float(stamp) > time.time()
+            ):
+                return True
+        except (TypeError, ValueError):
+            pass
+        key = self._pin_key(request)
+        return key is not None and key in self._pins
+
+    def choose(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def mark_unhealthy(self, replica: Replica, reason: str) -> None:
+        if replica.healthy:
+            logger.warning("Read replica %s taken out of rotation: %s", replica.name, reason)
+        replica.healthy = False
+
+    @staticmethod
+    async def _measure_lag(replica: Replica) -> float:
+        lag_sql = REPLICA_LAG_SQL.get(replica.engine.dialect.name, text("SELECT 0"))
+        async with replica.engine.connect() as connection:
+            return float(await connection.scalar(lag_sql) or 0)
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            lag = await asyncio.wait_for(self._measure_lag(replica), settings.READY_DB_TIMEOUT)
+        except Exception as exc:
+            replica.lag = None
+            self.mark_unhealthy(replica, f"health check failed ({exc.__class__.__name__})")
+            return
+        replica.lag = lag
+        if lag > settings.REPLICA_MAX_LAG_SECONDS:
+            self.mark_unhealthy(replica, f"lag {lag:.1f}s")
+        elif not replica.healthy:
+            logger.info("Read replica %s in rotation (lag %.1fs)", replica.name, lag)
+            replica.healthy = True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+            await asyncio.sleep(settings.REPLICA_CHECK_INTERVAL)
+
+    async def start(self) -> None:
+        if self.replicas and (self._task is None or self._task.done()):
+            await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+read_replicas = ReplicaSet([url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency for read-only routes: a replica session when one is healthy and
+    the client has not written recently, otherwise a primary session.
+    """
+    replica = None if read_replicas.is_pinned(request) else read_replicas.choose()
+    if replica is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    
+    async with replica.sessionmaker() as db:
+        try:
+            yield db
+        except (DBAPIError, OSError) as exc:
+            # Stop routing here until the next health check passes
+            read_replicas.mark_unhealthy(replica, exc.__class__.__name__)
+            raise
@@ -0,0 +1,22 @@
+"""
+Domain events published through the transactional outbox, and their handlers.
+
+Handlers run in the outbox dispatcher once the publishing transaction has
+committed, at least once per event, so they must be safe to repeat.
+"""
+import logging
+
+from app.core import outbox
+
+logger = logging.getLogger(__name__)
+
+ORDER_PLACED = "order.placed"  # {"order_id", "user_id", "total_amount", "items": [{"product_id", "quantity", "price"}]}
+
+
+@outbox.handler(ORDER_PLACED)
+async def log_order_placed(payload: dict) -> None:
+    # Confirmation emails, analytics and inventory sync subscribe here as well
+    logger.info(
+        "Order %s placed by user %s: %d line(s), total %.2f",
+        payload["order_id"], payload["user_id"], len(payload["items"]), payload["total_amount"],
+    )
@@ -1,42 +1,105 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import text
+from app.core import metrics, querycount
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.database import engine, Base
-from app.routes import auth, products, orders
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="AuraFashions API",
-    description="E-Kart E-commerce API for AuraFashions - T-Shirts & Hoodies",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        settings.FRONTEND_URL,
-        "http://localhost:5173",
-        "http://localhost:3000",
-        "https://aurafashions-844d1.web.app",
-        "https://aurafashions-844d1.firebaseapp.com",
-        "https://aurafashions.in",
-        "https://www.aurafashions.in"
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router)
-app.include_router(products.router)
-app.include_router(orders.router)
-
-
-@app.get("/")
+from app.core.idempotency import idempotency_keys
+from app.core.outbox import outbox_dispatcher
+from app.core.ratelimit import rate_limiter
+from app.core.reservations import reservation_sweeper
+from app.database import engine, Base, pool_usage, read_replicas, PRIMARY_UNTIL_HEADER
+from app.routes import auth, products, orders, reservations
+from app.auth import google
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied once per deploy (`python -m app.cli migrate`),
+    # not by every worker; create_all here is only a local development shortcut
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    
+    # Health/lag checks that keep read replicas in or out of rotation
+    await read_replicas.start()
+    # Returns expired cart holds to available stock
+    await reservation_sweeper.start()
+    # Deletes idempotency keys past their replay window
+    await idempotency_keys.start()
+    # Delivers post-checkout events unless a separate `app.cli outbox` process does
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        await outbox_dispatcher.start()
+    yield
+    await rate_limiter.close()
+    await outbox_dispatcher.stop()
+    await idempotency_keys.stop()
+    await reservation_sweeper.stop()
+    await read_replicas.stop()
+    await google.shutdown()
+    await engine.dispose()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="AuraFashions API",
+        description="E-Kart E-commerce API for AuraFashions - T-Shirts & Hoodies",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
+    
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            settings.FRONTEND_URL,
+            "http://localhost:5173",
+            "http://localhost:3000",
+            "https://aurafashions-844d1.web.app",
+            "https://aurafashions-844d1.firebaseapp.com",
+            "https://aurafashions.in",
+            "https://www.aurafashions.in"
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[PRIMARY_UNTIL_HEADER, "Retry-After"],
+    )
+    
+    # gzip/brotli for large bodies, negotiated per request
+    app.add_middleware(CompressionMiddleware)
+    
+    # Per-request SQL accounting feeds the debug headers and /metrics
+    for instrumented in (engine, *(replica.engine for replica in read_replicas.replicas)):
+        querycount.instrument_engine(instrumented)
+    if settings.QUERY_DEBUG:
+        app.add_middleware(querycount.QueryDebugMiddleware)
+    
+    # Request, DB and pool metrics (outermost so CORS preflights are counted too)
+    if settings.METRICS_ENABLED:
+        metrics.instrument_pool(engine)
+        for replica in read_replicas.replicas:
+            metrics.instrument_pool(replica.engine)
+        app.add_middleware(metrics.MetricsMiddleware)
+        app.add_api_route("/metrics", prometheus_metrics, methods=["GET"], include_in_schema=False)
+    
+    # Include routers
+    app.include_router(auth.router)
+    app.include_router(products.router)
+    app.include_router(orders.router)
+    app.include_router(reservations.router)
+    
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+    app.add_api_route("/health/ready", readiness_check, methods=["GET"])
+    return app
+
+
 async def root():
     return {
         "message": "Welcome to AuraFashions API",
@@ -45,7 +108,47 @@ async def root():
     }
 
 
-@app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+
+async def _ping_database() -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def readiness_check():
+    """
+    Readiness probe for the load balancer: 503 when the database does not
+    answer within READY_DB_TIMEOUT or this worker's pool is saturated, so
+    traffic drains to other workers instead of queueing on this one.
+    """
+    pool = pool_usage()
+    checks = {"pool": pool}
+    ready = True
+    
+    if pool and pool["saturation"] >= settings.READY_MAX_POOL_SATURATION:
+        # Skip the ping: it would only queue behind the requests already waiting
+        ready = False
+        checks["database"] = {"status": "skipped", "reason": "pool saturated"}
+    else:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(_ping_database(), settings.READY_DB_TIMEOUT)
+            checks["database"] = {"status": "ok"}
+        except Exception as exc:
+            ready = False
+            checks["database"] = {"status": "error", "error": exc.__class__.__name__}
+        checks["database"]["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", **checks},
+    )
+
+
+async def prometheus_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+app = create_app()
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, case, Integer, String, Float, ForeignKey, DateTime, Enum, Text, Index, JSON, LargeBinary, event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
+from app.core import search
 from app.database import Base
 import enum
 
+# Relationships use lazy="raise": every read path must choose a loader
+# strategy explicitly (e.g. selectinload) instead of issuing one query per row.
+
 
 class UserRole(str, enum.Enum):
     USER = "user"
@@ -18,6 +23,11 @@ class OrderStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+# SQLite stores CURRENT_TIMESTAMP without microseconds; bind parameters the same
+# way so keyset comparisons on created_at match the stored text exactly
+Timestamp = DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -28,24 +38,62 @@ class User(Base):
     role = Column(String(20), default=UserRole.USER.value)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    orders = relationship("Order", back_populates="user")
+    orders = relationship("Order", back_populates="user", lazy="raise")
+
+
+class ProductStyle(Base):
+    """
+    A style offered in several variants (one Product row per color/size SKU).
+    Holds the display attributes of the latest variant written; each variant
+    keeps its own price, which is what checkout charges.
+    """
+    __tablename__ = "product_styles"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    price = Column(Float, nullable=False)
+    category = Column(String(100), nullable=False)
+    image_url = Column(String(500), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    variants = relationship("Product", back_populates="style", lazy="raise")
+    
+    # Variants are matched to their style by (name, category)
+    __table_args__ = (
+        Index("ux_product_styles_name_category", "name", "category", unique=True),
+        Index("ix_product_styles_category_id", "category", "id"),
+    )
 
 
 class Product(Base):
     __tablename__ = "products"
     
     id = Column(Integer, primary_key=True, index=True)
+    style_id = Column(Integer, ForeignKey("product_styles.id"), nullable=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0)
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")  # units held by carts
     category = Column(String(100), nullable=False)  # t-shirt, hoodie
     color = Column(String(50), nullable=False)  # black, white
     size = Column(String(10), nullable=False)  # S, M, L, XL
     image_url = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Units others can still reserve or buy
+    available = column_property(case((stock > reserved, stock - reserved), else_=0).label("available"))
+    
+    style = relationship("ProductStyle", back_populates="variants", lazy="raise")
+    order_items = relationship("OrderItem", back_populates="product", lazy="raise")
     
-    order_items = relationship("OrderItem", back_populates="product")
+    # Keyset-ordered access paths for the GET /products filters
+    __table_args__ = (
+        Index("ix_products_category_color_size_id", "category", "color", "size", "id"),
+        Index("ix_products_category_id", "category", "id"),
+        Index("ix_products_color_size_id", "color", "size", "id"),
+        Index("ix_products_size_id", "size", "id"),
+    )
 
 
 class Order(Base):
@@ -56,21 +104,116 @@ class Order(Base):
     total_amount = Column(Float, nullable=False)
     status = Column(String(20), default=OrderStatus.PENDING.value)
     shipping_address = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    
+    user = relationship("User", back_populates="orders", lazy="raise")
+    items = relationship("OrderItem", back_populates="order", lazy="raise")
     
-    user = relationship("User", back_populates="orders")
-    items = relationship("OrderItem", back_populates="order")
+    # GET /orders/my: a user's orders newest first
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+    # Fetch server-generated created_at in the INSERT itself (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)  # Price at time of order
     
-    order = relationship("Order", back_populates="items")
-    product = relationship("Product", back_populates="order_items")
+    order = relationship("Order", back_populates="items", lazy="raise")
+    product = relationship("Product", back_populates="order_items", lazy="raise")
+
+
+class StockHold(Base):
+    """
+    A time-limited reservation of `quantity` units of one product for one
+    user's cart. Active holds are counted in products.reserved, so the
+    stock available to others is stock - reserved.
+    """
+    __tablename__ = "stock_holds"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(Timestamp, nullable=False)
+    
+    __table_args__ = (
+        Index("ux_stock_holds_user_id_product_id", "user_id", "product_id", unique=True),
+        Index("ix_stock_holds_expires_at", "expires_at"),  # sweeper scan
+    )
+
+
+class IdempotencyKey(Base):
+    """
+    Response of a request made with an Idempotency-Key header, written in the
+    same transaction as the request's own changes so a retry replays it
+    instead of executing again.
+    """
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(LargeBinary, nullable=False)
+    created_at = Column(Timestamp, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ux_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_created_at", "created_at"),  # purge scan
+    )
+
+
+class OutboxEvent(Base):
+    """
+    A side effect of a committed change (e.g. "order.placed"), inserted in the
+    same transaction as the change and delivered later by the outbox
+    dispatcher. Delivered events are deleted; an event that keeps failing is
+    parked with available_at = NULL and its last error.
+    """
+    __tablename__ = "outbox_events"
+    
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(Timestamp, nullable=True, server_default=func.now())  # next delivery attempt
+    last_error = Column(Text, nullable=True)
+    created_at = Column(Timestamp, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_outbox_events_available_at", "available_at"),  # dispatcher scan
+    )
+
+
+class CatalogState(Base):
+    """Single-row table holding the product catalog version used for HTTP caching"""
+    __tablename__ = "catalog_state"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Full-text index over products(name, description); see app/core/search.py
+for _statement in search.SQLITE_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in search.POSTGRES_DDL:
+    event.listen(Product.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Product.__table__, "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {search.FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
 
+@event.listens_for(CatalogState.__table__, "after_create")
+def _seed_catalog_state(target, connection, **kw):
+    connection.execute(target.insert().values(id=1, version=1, updated_at=func.now()))
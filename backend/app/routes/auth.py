@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from pydantic import BaseModel
 from typing import Optional
@@ -7,8 +8,9 @@ from app.database import get_db
 from app.models import User
 from app.schemas import GoogleAuthRequest, TokenResponse, UserResponse
 from app.auth.google import verify_google_token
-from app.auth.jwt import create_access_token, get_current_user
+from app.auth.jwt import Principal, create_access_token, get_current_user, principal_cache
 from app.core.config import settings
+from app.core.ratelimit import limit_by_ip
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -20,8 +22,8 @@ class DevLoginRequest(BaseModel):
     is_admin: bool = False
 
 
-@router.post("/google", response_model=TokenResponse)
-async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db)):
+@router.post("/google", response_model=TokenResponse, dependencies=[limit_by_ip("auth_google")])
+async def google_auth(request: GoogleAuthRequest, db: AsyncSession = Depends(get_db)):
     """
     Authenticate user via Google OAuth
     - Verifies Google ID token
@@ -34,7 +36,7 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
         email = "dev@aurafashions.com"
         name = "Dev User"
         
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email))
         if not user:
             user = User(
                 email=email,
@@ -43,8 +45,8 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
                 role="admin"  # Make dev user admin by default
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
         
         access_token = create_access_token(
             data={"sub": str(user.id), "email": user.email},
@@ -58,10 +60,10 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
         )
     
     # Production: Verify Google token
-    google_user = verify_google_token(request.token)
+    google_user = await verify_google_token(request.token)
     
     # Check if user exists
-    user = db.query(User).filter(User.email == google_user["email"]).first()
+    user = await db.scalar(select(User).where(User.email == google_user["email"]))
     
     if not user:
         # Create new user
@@ -72,15 +74,16 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
             role="user"
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     else:
         # Update user info if changed
         if user.name != google_user["name"] or user.picture != google_user.get("picture"):
             user.name = google_user["name"]
             user.picture = google_user.get("picture")
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
+            principal_cache.invalidate_user(user.id)
     
     # Create access token
     access_token = create_access_token(
@@ -95,8 +98,8 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
     )
 
 
-@router.post("/dev-login", response_model=TokenResponse)
-async def dev_login(request: DevLoginRequest = DevLoginRequest(), db: Session = Depends(get_db)):
+@router.post("/dev-login", response_model=TokenResponse, dependencies=[limit_by_ip("auth_dev_login")])
+async def dev_login(request: DevLoginRequest = DevLoginRequest(), db: AsyncSession = Depends(get_db)):
     """
     Development-only login endpoint.
     Allows login without Google OAuth for testing purposes.
@@ -109,7 +112,7 @@ async def dev_login(request: DevLoginRequest = DevLoginRequest(), db: Session =
         )
     
     # Check if user exists
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     
     if not user:
         # Create new user
@@ -120,13 +123,14 @@ async def dev_login(request: DevLoginRequest = DevLoginRequest(), db: Session =
             role="admin" if request.is_admin else "user"
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     elif request.is_admin and user.role != "admin":
         # Update to admin if requested
         user.role = "admin"
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        principal_cache.invalidate_user(user.id)
     
     # Create access token
     access_token = create_access_token(
@@ -148,7 +152,7 @@ async def check_dev_mode():
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Get current authenticated user info"""
     return current_user
 
@@ -1,121 +1,345 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import Order, OrderItem, Product, User
-from app.schemas import OrderCreate, OrderResponse, OrderListResponse
-from app.auth.jwt import get_current_user
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from sqlalchemy import case, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.database import get_db, get_read_db, read_replicas
+from app.models import Order, OrderItem, Product, StockHold
+from app.schemas import (
+    OrderCreate,
+    OrderResponse,
+    OrderPage,
+    OrderItemResponse,
+    OrderSummaryPage,
+)
+from app.auth.jwt import Principal, get_current_user
+from app.events import ORDER_PLACED
+from app.core.catalog import catalog_version
+from app.core import outbox
+from app.core.outbox import outbox_dispatcher
+from app.core.idempotency import IDEMPOTENCY_HEADER, fingerprint, idempotency_keys
+from app.core.ratelimit import limit_user
+from app.core.reservations import claim_holds
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.serialization import dump_model, dumps, field_names, json_response, projection
+from app.routes.products import PRODUCT_COLUMNS, PRODUCT_FIELDS
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+# Columns serialized by OrderResponse: one query for the orders and one for all
+# their items joined to their products, whatever the history size
+ORDER_COLUMNS = projection(Order, OrderResponse, exclude={"items"})
+ORDER_FIELDS = field_names(ORDER_COLUMNS)
+ORDER_ITEM_COLUMNS = projection(OrderItem, OrderItemResponse, exclude={"product"})
+ORDER_ITEM_FIELDS = field_names(ORDER_ITEM_COLUMNS)
+
+
+def _insufficient_stock(name: str, available: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Insufficient stock for product '{name}'. Available: {available}"
+    )
+
+
+async def load_order_items(db: AsyncSession, order_ids: Sequence[int]) -> Dict[int, List[dict]]:
+    """Items of the given orders with their products, as OrderItemResponse dicts"""
+    items = {order_id: [] for order_id in order_ids}
+    if not items:
+        return items
+    
+    width = len(ORDER_ITEM_COLUMNS)
+    rows = await db.execute(
+        select(OrderItem.order_id, *ORDER_ITEM_COLUMNS, *PRODUCT_COLUMNS)
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(OrderItem.order_id.in_(items))
+        .order_by(OrderItem.id)
+    )
+    for order_id, *values in rows:
+        item = dict(zip(ORDER_ITEM_FIELDS, values[:width]))
+        item["product"] = dict(zip(PRODUCT_FIELDS, values[width:]))
+        items[order_id].append(item)
+    return items
+
+
+def my_orders_query(user_id: int, before: Optional[Tuple[datetime, int]] = None, limit: int = 20):
+    """Keyset page of a user's orders, newest first; fetches one extra row"""
+    query = select(Order).where(Order.user_id == user_id)
+    if before:
+        query = query.where(tuple_(Order.created_at, Order.id) < before)
+    return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
 
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create new order (PROTECTED - auth required)
+    Send a unique Idempotency-Key header to make retries safe: a repeated key
+    returns the first order's response instead of placing another order.
     """
+    if idempotency_key is None:
+        await limit_user("orders_create", current_user.id)
+        response = await place_order(db, current_user.id, order_data)
+    else:
+        request_fingerprint = fingerprint(order_data)
+
+        async def execute():
+            # Only a request that will place an order takes a token; replays never do
+            await limit_user("orders_create", current_user.id)
+            return await place_order(db, current_user.id, order_data, idempotency_key, request_fingerprint)
+
+        response = await idempotency_keys.run(db, current_user.id, idempotency_key, request_fingerprint, execute)
+    
+    # Order history must show this order even while replicas catch up
+    read_replicas.pin_to_primary(request, response)
+    return response
+
+
+async def place_order(
+    db: AsyncSession,
+    user_id: int,
+    order_data: OrderCreate,
+    idempotency_key: Optional[str] = None,
+    request_fingerprint: Optional[str] = None,
+) -> Response:
+    """Validate the cart, decrement stock and insert the order in one transaction"""
     if not order_data.items:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Order must have at least one item"
         )
     
-    total_amount = 0
-    order_items = []
+    # Total quantity per product (a cart may list the same product twice)
+    quantities = {}
+    for item in order_data.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
+    # Load every product, with the buyer's hold on it if any, in one query
+    products, holds = {}, {}
+    for product, held_quantity in await db.execute(
+        select(Product, StockHold.quantity)
+        .outerjoin(StockHold, (StockHold.product_id == Product.id) & (StockHold.user_id == user_id))
+        .where(Product.id.in_(quantities))
+    ):
+        products[product.id] = product
+        if held_quantity is not None:
+            holds[product.id] = held_quantity
     
-    # Validate products and calculate total
     for item in order_data.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
+        product = products.get(item.product_id)
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Product with ID {item.product_id} not found"
             )
-        
-        if product.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for product '{product.name}'. Available: {product.stock}"
-            )
-        
-        item_total = product.price * item.quantity
-        total_amount += item_total
-        
-        order_items.append({
-            "product": product,
-            "quantity": item.quantity,
-            "price": product.price
-        })
+    
+    # Fail fast on stock we already know is short; the guarded UPDATE below is authoritative
+    for product_id, quantity in quantities.items():
+        product = products[product_id]
+        available = product.stock - product.reserved + holds.get(product_id, 0)
+        if available < quantity:
+            raise _insufficient_stock(product.name, max(available, 0))
+    
+    # The buyer's cart holds, expired or not, become part of this checkout;
+    # their units are still counted in reserved until the UPDATE below
+    held = await claim_holds(db, user_id, holds) if holds else {}
+    
+    # Atomically decrement all lines in one statement; a row is only updated
+    # while its unreserved stock plus the buyer's own holds covers the order,
+    # so concurrent checkouts cannot oversell or take units held by other carts
+    ordered = case(quantities, value=Product.id)
+    released = case(held, value=Product.id, else_=0) if held else 0
+    updated = (await db.execute(
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock - Product.reserved + released >= ordered)
+        .values(stock=Product.stock - ordered, reserved=Product.reserved - released)
+        .returning(Product.id, Product.stock, Product.reserved)
+        .execution_options(synchronize_session=False)
+    )).all()
+    
+    if len(updated) != len(quantities):
+        short_ids = set(quantities) - {row.id for row in updated}
+        short = (await db.execute(
+            select(Product.id, Product.name, Product.stock - Product.reserved + released)
+            .where(Product.id.in_(short_ids))
+            .order_by(Product.id)
+        )).first()
+        await db.rollback()
+        raise _insufficient_stock(short.name, max(short[2], 0))
+    
+    for row in updated:
+        set_committed_value(products[row.id], "stock", row.stock)
+        set_committed_value(products[row.id], "reserved", row.reserved)
+    
+    total_amount = sum(products[item.product_id].price * item.quantity for item in order_data.items)
     
     # Create order
     db_order = Order(
-        user_id=current_user.id,
+        user_id=user_id,
         total_amount=total_amount,
         status="pending",
         shipping_address=order_data.shipping_address
     )
     db.add(db_order)
-    db.flush()  # Get order ID
-    
-    # Create order items and update stock
-    for item_data in order_items:
-        order_item = OrderItem(
-            order_id=db_order.id,
-            product_id=item_data["product"].id,
-            quantity=item_data["quantity"],
-            price=item_data["price"]
-        )
-        db.add(order_item)
-        
-        # Update stock
-        item_data["product"].stock -= item_data["quantity"]
+    await db.flush()  # Get order ID
+    
+    # Insert all order items in one statement
+    items = (await db.scalars(
+        insert(OrderItem).returning(OrderItem),
+        [
+            {
+                "order_id": db_order.id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price": products[item.product_id].price,
+            }
+            for item in order_data.items
+        ],
+    )).all()
+    
+    # Build the response graph from what is already loaded instead of re-querying
+    for order_item in items:
+        set_committed_value(order_item, "product", products[order_item.product_id])
+    set_committed_value(db_order, "items", items)
+    
+    response = json_response(dump_model(OrderResponse, db_order), status_code=status.HTTP_201_CREATED)
+    if idempotency_key is not None:
+        # Committed with the order: a retry can never place a second one
+        await idempotency_keys.save(db, user_id, idempotency_key, request_fingerprint, response)
     
-    db.commit()
-    db.refresh(db_order)
+    # Post-checkout side effects run from the outbox once this commits, not in the request
+    await outbox.publish(db, ORDER_PLACED, {
+        "order_id": db_order.id,
+        "user_id": user_id,
+        "total_amount": total_amount,
+        "items": [
+            {"product_id": item.product_id, "quantity": item.quantity, "price": item.price}
+            for item in items
+        ],
+    })
     
-    return db_order
+    # Last statement before commit: catalog_state is a single hot row
+    await catalog_version.bump(db)
+    await db.commit()
+    outbox_dispatcher.notify()
+    return response
 
 
-@router.get("/my", response_model=List[OrderResponse])
+@router.get("/my", response_model=OrderPage)
 async def get_my_orders(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get current user's orders, newest first (PROTECTED - auth required)
+    Paginated by (created_at, id); pass next_cursor back as `cursor` for the next page.
+    """
+    before = decode_cursor(cursor, datetime, int)
+    rows = (await db.execute(
+        my_orders_query(current_user.id, before, limit).with_only_columns(*ORDER_COLUMNS)
+    )).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    orders = [dict(zip(ORDER_FIELDS, row)) for row in rows[:limit]]
+    items = await load_order_items(db, [order["id"] for order in orders])
+    for order in orders:
+        order["items"] = items[order["id"]]
+    
+    return json_response(dumps({"items": orders, "next_cursor": next_cursor}))
+
+
+def my_order_summaries_query(user_id: int, before: Optional[Tuple[datetime, int]] = None, limit: int = 20):
+    """
+    One grouped query for a page of order summaries: item count per order and
+    the image of each order's first item, without loading items or products
+    """
+    page = my_orders_query(user_id, before, limit).subquery()
+    first_item = aliased(OrderItem)
+    thumbnail = (
+        select(Product.image_url)
+        .join(first_item, first_item.product_id == Product.id)
+        .where(first_item.order_id == page.c.id)
+        .order_by(first_item.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            page.c.id,
+            page.c.total_amount,
+            page.c.status,
+            page.c.created_at,
+            func.count(OrderItem.id).label("items_count"),
+            thumbnail.label("thumbnail_url"),
+        )
+        .select_from(page)
+        .outerjoin(OrderItem, OrderItem.order_id == page.c.id)
+        .group_by(page.c.id, page.c.total_amount, page.c.status, page.c.created_at)
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+    )
+
+
+@router.get("/my/summary", response_model=OrderSummaryPage)
+async def get_my_order_summaries(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Get current user's orders (PROTECTED - auth required)
+    Get a lightweight summary of the current user's orders, newest first (PROTECTED - auth required)
+    Open a single order with GET /orders/{order_id} for its items.
     """
-    orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
-    return orders
+    before = decode_cursor(cursor, datetime, int)
+    rows = (await db.execute(my_order_summaries_query(current_user.id, before, limit))).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return json_response(dumps({
+        "items": [row._asdict() for row in rows[:limit]],
+        "next_cursor": next_cursor,
+    }))
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get specific order by ID (PROTECTED - auth required)
-    Users can only view their own orders
+    Users can only view their own orders; others' orders are reported as not found
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    query = select(*ORDER_COLUMNS).where(Order.id == order_id)
+    
+    # Ownership is part of the query (admins may view any order)
+    if current_user.role != "admin":
+        query = query.where(Order.user_id == current_user.id)
     
-    if not order:
+    row = (await db.execute(query)).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
         )
     
-    # Check if user owns this order (unless admin)
-    if order.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    return order
-
+    order = dict(zip(ORDER_FIELDS, row))
+    order["items"] = (await load_order_items(db, [order_id]))[order_id]
+    return json_response(dumps(order))
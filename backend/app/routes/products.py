@@ -1,165 +1,676 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
-from app.models import Product, User
-from app.schemas import ProductCreate, ProductUpdate, ProductResponse
-from app.auth.jwt import get_current_admin
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy import (
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from app.database import get_db, get_read_db, read_replicas
+from app.core.catalog import (
+    cache_headers,
+    catalog_bodies,
+    catalog_version,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from app.core.config import settings
+from app.core.ingest import detect_format, iter_records
+from app.core import search
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.serialization import dumps, field_names, json_response, projection
+from app.models import Product, ProductStyle, StockHold
+from app.schemas import (
+    ProductCreate,
+    ProductUpdate,
+    ProductResponse,
+    ProductPage,
+    ProductFacets,
+    ProductStylePage,
+    ProductStyleResponse,
+    ProductVariant,
+    ProductImportRow,
+    ProductImportResult,
+    ProductImportError,
+)
+from app.auth.jwt import Principal, get_current_admin
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Columns serialized by ProductResponse; reads select these instead of entities
+PRODUCT_COLUMNS = projection(Product, ProductResponse)
+PRODUCT_FIELDS = field_names(PRODUCT_COLUMNS)
+STYLE_COLUMNS = projection(ProductStyle, ProductStyleResponse, exclude={"variants"})
+STYLE_FIELDS = field_names(STYLE_COLUMNS)
+VARIANT_COLUMNS = projection(Product, ProductVariant)
+VARIANT_FIELDS = field_names(VARIANT_COLUMNS)
 
-@router.get("", response_model=List[ProductResponse])
+
+def product_list_query(
+    category: Optional[str] = None,
+    color: Optional[str] = None,
+    size: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 50,
+):
+    """Keyset page of products; fetches one extra row to detect a next page"""
+    query = select(*PRODUCT_COLUMNS)
+    
+    if category:
+        query = query.where(Product.category == category)
+    if color:
+        query = query.where(Product.color == color)
+    if size:
+        query = query.where(Product.size == size)
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+    
+    return query.order_by(Product.id).limit(limit + 1)
+
+
+@router.get("", response_model=ProductPage)
 async def get_products(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category (t-shirt, hoodie)"),
     color: Optional[str] = Query(None, description="Filter by color (black, white)"),
     size: Optional[str] = Query(None, description="Filter by size (S, M, L, XL)"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all products (PUBLIC - no auth required)
-    Supports filtering by category, color, and size
+    Supports filtering by category, color, and size.
+    Paginated by product id; pass next_cursor back as `cursor` for the next page.
+    Honors If-None-Match / If-Modified-Since against the catalog version.
     """
-    query = db.query(Product)
+    category = category.lower() if category else None
+    color = color.lower() if color else None
+    size = size.upper() if size else None
+    after = decode_cursor(cursor, int)
+    
+    snapshot = await catalog_version.current(db)
+    etag = make_etag(snapshot, "list", category, color, size, after, limit)
+    headers = cache_headers(etag, snapshot)
+    if is_not_modified(request, etag, snapshot):
+        return not_modified_response(headers)
+    
+    body = catalog_bodies.get(etag)
+    if body is None:
+        after_id = after[0] if after else None
+        rows = (await db.execute(product_list_query(category, color, size, after_id, limit))).all()
+        next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+        body = dumps({
+            "items": [dict(zip(PRODUCT_FIELDS, row)) for row in rows[:limit]],
+            "next_cursor": next_cursor,
+        })
+        catalog_bodies.set(etag, body)
+    
+    return json_response(body, headers=headers)
+
+
+def product_search_query(
+    dialect: str,
+    terms: List[str],
+    category: Optional[str] = None,
+    color: Optional[str] = None,
+    size: Optional[str] = None,
+    in_stock: bool = False,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = 20,
+):
+    """
+    Ranked keyset page of products matching every search term; fetches one
+    extra row. The index ranks every match (lower rank is better) and pages
+    are ordered by (rank, id), so no match is dropped however broad the query.
+    """
+    if dialect == "sqlite":
+        fts = table(search.FTS_TABLE, column("rowid"), column("rank"))
+        rank = fts.c.rank
+        query = (
+            select(*PRODUCT_COLUMNS, rank.label("rank"))
+            .select_from(fts)
+            .join(Product, Product.id == fts.c.rowid)
+            .where(
+                text(f"{search.FTS_TABLE} MATCH :match").bindparams(match=search.fts5_match(terms)),
+                text(f"{search.FTS_TABLE}.rank MATCH :ranking").bindparams(ranking=search.FTS5_RANK),
+            )
+        )
+    else:
+        vector = literal_column(f"products.{search.SEARCH_VECTOR_COLUMN}")
+        tsquery = func.to_tsquery(search.POSTGRES_CONFIG, search.tsquery(terms))
+        rank = -func.ts_rank(vector, tsquery)  # ts_rank is higher for better matches
+        query = select(*PRODUCT_COLUMNS, rank.label("rank")).where(vector.op("@@")(tsquery))
     
     if category:
-        query = query.filter(Product.category == category.lower())
+        query = query.where(Product.category == category)
+    if color:
+        query = query.where(Product.color == color)
+    if size:
+        query = query.where(Product.size == size)
+    if in_stock:
+        query = query.where(Product.available > 0)
+    if after is not None:
+        query = query.where(tuple_(rank, Product.id) > after)
+    return query.order_by(rank, Product.id).limit(limit + 1)
+
+
+@router.get("/search", response_model=ProductPage)
+async def search_products(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find; each matches as a prefix"),
+    category: Optional[str] = Query(None, description="Filter by category (t-shirt, hoodie)"),
+    color: Optional[str] = Query(None, description="Filter by color (black, white)"),
+    size: Optional[str] = Query(None, description="Filter by size (S, M, L, XL)"),
+    in_stock: bool = Query(False, description="Only products with stock not held by carts"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over product name and description (PUBLIC - no auth required)
+    All words must match; results are ranked with name matches first.
+    Paginated by rank; cached and revalidated like GET /products.
+    """
+    terms = search.search_terms(q)
+    category = category.lower() if category else None
+    color = color.lower() if color else None
+    size = size.upper() if size else None
+    after = decode_cursor(cursor, float, int)
+    
+    snapshot = await catalog_version.current(db)
+    etag = make_etag(snapshot, "search", terms, category, color, size, in_stock, after, limit)
+    headers = cache_headers(etag, snapshot)
+    if is_not_modified(request, etag, snapshot):
+        return not_modified_response(headers)
+    
+    body = catalog_bodies.get(etag)
+    if body is None:
+        rows = []
+        if terms:
+            rows = (await db.execute(product_search_query(
+                db.bind.dialect.name, terms, category, color, size, in_stock, after, limit
+            ))).all()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.rank, last.id)
+        body = dumps({
+            "items": [dict(zip(PRODUCT_FIELDS, row)) for row in rows[:limit]],
+            "next_cursor": next_cursor,
+        })
+        catalog_bodies.set(etag, body)
+    
+    return json_response(body, headers=headers)
+
+
+FACETS = ("category", "color", "size")
+
+
+def facet_counts_query(filters: dict):
+    """
+    Counts per value of each facet in one statement (a UNION ALL of three
+    GROUP BYs). Each facet is filtered by the *other* selected facets, so
+    the counts say what choosing that value would return.
+    """
+    in_stock = func.sum(case((Product.available > 0, 1), else_=0))
+    selects = []
+    for facet in FACETS:
+        facet_column = getattr(Product, facet)
+        query = select(
+            literal(facet).label("facet"),
+            facet_column.label("value"),
+            func.count().label("total"),
+            in_stock.label("in_stock"),
+        ).group_by(facet_column)
+        for other, value in filters.items():
+            if other != facet and value:
+                query = query.where(getattr(Product, other) == value)
+        selects.append(query)
+    return union_all(*selects)
+
+
+@router.get("/facets", response_model=ProductFacets)
+async def get_product_facets(
+    request: Request,
+    category: Optional[str] = Query(None, description="Selected category (t-shirt, hoodie)"),
+    color: Optional[str] = Query(None, description="Selected color (black, white)"),
+    size: Optional[str] = Query(None, description="Selected size (S, M, L, XL)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Product and in-stock counts for every category, color and size (PUBLIC - no auth required)
+    Counts for one facet apply the other selected filters, as the filter UI
+    shows them. Cached and revalidated like GET /products.
+    """
+    filters = {
+        "category": category.lower() if category else None,
+        "color": color.lower() if color else None,
+        "size": size.upper() if size else None,
+    }
+    
+    snapshot = await catalog_version.current(db)
+    etag = make_etag(snapshot, "facets", *filters.values())
+    headers = cache_headers(etag, snapshot)
+    if is_not_modified(request, etag, snapshot):
+        return not_modified_response(headers)
+    
+    body = catalog_bodies.get(etag)
+    if body is None:
+        counts = {facet: {} for facet in FACETS}
+        for facet, value, total, in_stock in await db.execute(facet_counts_query(filters)):
+            counts[facet][value] = {"value": value, "count": total, "in_stock": in_stock}
+        facets = {}
+        for facet, known_values in zip(FACETS, (CATEGORIES, COLORS, SIZES)):
+            # Every known value (zero when nothing matches), then any others present in the data
+            found = counts[facet]
+            values = known_values + sorted(set(found) - set(known_values))
+            facets[facet] = [found.get(value, {"value": value, "count": 0, "in_stock": 0}) for value in values]
+        body = dumps(facets)
+        catalog_bodies.set(etag, body)
+    
+    return json_response(body, headers=headers)
+
+
+def style_page_query(
+    category: Optional[str] = None,
+    color: Optional[str] = None,
+    size: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 24,
+):
+    """
+    A keyset page of styles (one extra to detect a next page) joined to all
+    of their variants, ordered by style then variant. A style matches the
+    color/size filters when any of its variants does.
+    """
+    matching_variant = select(Product.id).where(Product.style_id == ProductStyle.id)
     if color:
-        query = query.filter(Product.color == color.lower())
+        matching_variant = matching_variant.where(Product.color == color)
     if size:
-        query = query.filter(Product.size == size.upper())
+        matching_variant = matching_variant.where(Product.size == size)
+    
+    page = select(ProductStyle.id).where(matching_variant.exists())
+    if category:
+        page = page.where(ProductStyle.category == category)
+    if after_id is not None:
+        page = page.where(ProductStyle.id > after_id)
+    page = page.order_by(ProductStyle.id).limit(limit + 1).subquery()
+    
+    return (
+        select(*STYLE_COLUMNS, *VARIANT_COLUMNS)
+        .join(page, page.c.id == ProductStyle.id)
+        .join(Product, Product.style_id == ProductStyle.id)
+        .order_by(ProductStyle.id, Product.id)
+    )
+
+
+@router.get("/styles", response_model=ProductStylePage)
+async def get_product_styles(
+    request: Request,
+    category: Optional[str] = Query(None, description="Filter by category (t-shirt, hoodie)"),
+    color: Optional[str] = Query(None, description="Only styles offered in this color (black, white)"),
+    size: Optional[str] = Query(None, description="Only styles offered in this size (S, M, L, XL)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int = Query(24, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get products grouped by style (PUBLIC - no auth required)
+    Each style lists all of its variants (product id, color, size, price,
+    stock and available units) so a product grid needs one request and one
+    query per page.
+    Paginated by style id; cached and revalidated like GET /products.
+    """
+    category = category.lower() if category else None
+    color = color.lower() if color else None
+    size = size.upper() if size else None
+    after = decode_cursor(cursor, int)
+    
+    snapshot = await catalog_version.current(db)
+    etag = make_etag(snapshot, "styles", category, color, size, after, limit)
+    headers = cache_headers(etag, snapshot)
+    if is_not_modified(request, etag, snapshot):
+        return not_modified_response(headers)
+    
+    body = catalog_bodies.get(etag)
+    if body is None:
+        after_id = after[0] if after else None
+        rows = await db.execute(style_page_query(category, color, size, after_id, limit))
+        width = len(STYLE_COLUMNS)
+        styles = []
+        for row in rows:
+            if not styles or styles[-1]["id"] != row[0]:
+                styles.append({**dict(zip(STYLE_FIELDS, row[:width])), "variants": []})
+            styles[-1]["variants"].append(dict(zip(VARIANT_FIELDS, row[width:])))
+        next_cursor = encode_cursor(styles[limit - 1]["id"]) if len(styles) > limit else None
+        body = dumps({"items": styles[:limit], "next_cursor": next_cursor})
+        catalog_bodies.set(etag, body)
     
-    products = query.offset(skip).limit(limit).all()
-    return products
+    return json_response(body, headers=headers)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get single product by ID (PUBLIC - no auth required)"""
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
-        )
-    return product
+    snapshot = await catalog_version.current(db)
+    etag = make_etag(snapshot, "detail", product_id)
+    headers = cache_headers(etag, snapshot)
+    if is_not_modified(request, etag, snapshot):
+        return not_modified_response(headers)
+    
+    body = catalog_bodies.get(etag)
+    if body is None:
+        row = (await db.execute(select(*PRODUCT_COLUMNS).where(Product.id == product_id))).first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+        body = dumps(dict(zip(PRODUCT_FIELDS, row)))
+        catalog_bodies.set(etag, body)
+    
+    return json_response(body, headers=headers)
 
 
 # ============ Admin Only Routes ============
 
+CATEGORIES = ["t-shirt", "hoodie"]
+COLORS = ["black", "white"]
+SIZES = ["S", "M", "L", "XL"]
+
+
+def normalize_product_fields(data: dict) -> dict:
+    """
+    Validate category/color/size (when present) against the catalog rules
+    and normalize their case. Raises ValueError with a user-facing message.
+    """
+    data = dict(data)
+    if "category" in data:
+        category = (data["category"] or "").lower()
+        if category not in CATEGORIES:
+            raise ValueError("Category must be 't-shirt' or 'hoodie'")
+        data["category"] = category
+    if "color" in data:
+        color = (data["color"] or "").lower()
+        if color not in COLORS:
+            raise ValueError("Color must be 'black' or 'white'")
+        data["color"] = color
+    if "size" in data:
+        size = (data["size"] or "").upper()
+        if size not in SIZES:
+            raise ValueError("Size must be 'S', 'M', 'L', or 'XL'")
+        data["size"] = size
+    return data
+
+
+# Attributes a style shares with its variants, besides the (name, category) key
+STYLE_ATTRIBUTES = ("description", "price", "image_url")
+
+
+async def assign_styles(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Set `style_id` on product rows from their (name, category), creating
+    missing styles. A style's shared attributes follow the latest variant
+    written, so rows must carry name, category and STYLE_ATTRIBUTES. Only the
+    style row is updated: the other variants keep their own values.
+    """
+    latest = {(row["name"], row["category"]): row for row in rows}
+    found = await db.execute(
+        select(ProductStyle.id, ProductStyle.name, ProductStyle.category)
+        .where(tuple_(ProductStyle.name, ProductStyle.category).in_(list(latest)))
+    )
+    style_ids = {(row.name, row.category): row.id for row in found}
+    
+    updates, missing = [], []
+    for (name, category), row in latest.items():
+        attributes = {key: row[key] for key in STYLE_ATTRIBUTES}
+        if (name, category) in style_ids:
+            updates.append({"id": style_ids[(name, category)], **attributes})
+        else:
+            missing.append({"name": name, "category": category, **attributes})
+    
+    if updates:
+        await db.execute(update(ProductStyle), updates)
+    if missing:
+        created = await db.execute(
+            insert(ProductStyle).returning(ProductStyle.id, ProductStyle.name, ProductStyle.category),
+            missing,
+        )
+        style_ids.update({(row.name, row.category): row.id for row in created})
+    
+    for row in rows:
+        row["style_id"] = style_ids[(row["name"], row["category"])]
+
+
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product: ProductCreate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
 ):
     """Create new product (ADMIN only)"""
-    # Validate category
-    if product.category.lower() not in ["t-shirt", "hoodie"]:
+    try:
+        product_data = normalize_product_fields(product.model_dump())
+    except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Category must be 't-shirt' or 'hoodie'"
+            detail=str(exc)
         )
     
-    # Validate color
-    if product.color.lower() not in ["black", "white"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Color must be 'black' or 'white'"
+    await assign_styles(db, [product_data])
+    db_product = Product(**product_data)
+    db.add(db_product)
+    await catalog_version.bump(db)
+    await db.commit()
+    read_replicas.pin_to_primary(request, response)
+    await db.refresh(db_product)
+    return db_product
+
+
+def _add_import_error(result: ProductImportResult, line: int, error: str) -> None:
+    result.failed += 1
+    if len(result.errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+        result.errors.append(ProductImportError(line=line, error=error))
+
+
+def _describe_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def _upsert_product_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, dict]],
+    result: ProductImportResult,
+) -> None:
+    """
+    Write one chunk of validated rows and the catalog version bump in a single
+    transaction: rows with an id update that product, the rest upsert on
+    (name, category, color, size).
+    Within a chunk the last row for a product wins.
+    """
+    by_id, by_key = {}, {}
+    for line, data in batch:
+        if data["id"] is not None:
+            by_id[data["id"]] = (line, data)
+        else:
+            by_key[(data["name"], data["category"], data["color"], data["size"])] = (line, data)
+    superseded = len(batch) - len(by_id) - len(by_key)
+    
+    updates, inserts = [], []
+    if by_id:
+        existing = set(await db.scalars(select(Product.id).where(Product.id.in_(by_id))))
+        for product_id, (line, data) in by_id.items():
+            if product_id in existing:
+                updates.append(data)
+            else:
+                _add_import_error(result, line, f"Product with ID {product_id} not found")
+    
+    if by_key:
+        key_columns = (Product.name, Product.category, Product.color, Product.size)
+        rows = await db.execute(
+            select(Product.id, *key_columns)
+            .where(tuple_(*key_columns).in_(list(by_key)))
+            .order_by(Product.id.desc())
         )
+        # Descending scan: if the catalog already holds duplicates, the oldest row wins
+        matched = {(row.name, row.category, row.color, row.size): row.id for row in rows}
+        for key, (line, data) in by_key.items():
+            if key in matched:
+                updates.append({**data, "id": matched[key]})
+            else:
+                inserts.append({k: v for k, v in data.items() if k != "id"})
+    
+    try:
+        if updates or inserts:
+            await assign_styles(db, updates + inserts)
+        if updates:
+            await db.execute(update(Product), updates)
+        if inserts:
+            await db.execute(insert(Product), inserts)
+        if updates or inserts:
+            # With the chunk, so an import that aborts later leaves no stale catalog cache
+            await catalog_version.bump(db)
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        for line, _ in batch:
+            _add_import_error(result, line, f"Batch rejected by database: {exc.__class__.__name__}")
+        return
     
-    # Validate size
-    if product.size.upper() not in ["S", "M", "L", "XL"]:
+    result.inserted += len(inserts)
+    result.updated += len(updates) + superseded
+
+
+@router.post("/import", response_model=ProductImportResult)
+async def import_products(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
+):
+    """
+    Bulk create/update products from a streamed body (ADMIN only)
+    - Content-Type application/x-ndjson (one JSON object per line) or text/csv (header row)
+    - Fields as for POST /products, plus an optional `id` to update a specific product
+    - Rows without an id upsert on (name, category, color, size)
+    - Valid rows are written in chunks of PRODUCT_IMPORT_BATCH_SIZE, one transaction each;
+      invalid rows are skipped and reported by line number
+    """
+    fmt = detect_format(request.headers.get("content-type", ""))
+    if fmt is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Size must be 'S', 'M', 'L', or 'XL'"
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type must be application/x-ndjson or text/csv"
         )
     
-    db_product = Product(
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        stock=product.stock,
-        category=product.category.lower(),
-        color=product.color.lower(),
-        size=product.size.upper(),
-        image_url=product.image_url
-    )
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    return db_product
+    result = ProductImportResult()
+    batch = []
+    async for line, record, error in iter_records(fmt, request.stream()):
+        if error is None:
+            try:
+                data = normalize_product_fields(ProductImportRow.model_validate(record).model_dump())
+            except ValidationError as exc:
+                error = _describe_validation_error(exc)
+            except ValueError as exc:
+                error = str(exc)
+        if error is not None:
+            _add_import_error(result, line, error)
+            continue
+        
+        batch.append((line, data))
+        if len(batch) >= settings.PRODUCT_IMPORT_BATCH_SIZE:
+            await _upsert_product_batch(db, batch, result)
+            batch = []
+    
+    if batch:
+        await _upsert_product_batch(db, batch, result)
+    
+    if result.inserted or result.updated:
+        read_replicas.pin_to_primary(request, response)
+    
+    return result
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
 ):
     """Update product (ADMIN only)"""
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = await db.get(Product, product_id)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    update_data = product_update.model_dump(exclude_unset=True)
-    
-    # Validate category if provided
-    if "category" in update_data and update_data["category"].lower() not in ["t-shirt", "hoodie"]:
+    # Validate category/color/size if provided
+    try:
+        update_data = normalize_product_fields(product_update.model_dump(exclude_unset=True))
+    except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Category must be 't-shirt' or 'hoodie'"
-        )
-    
-    # Validate color if provided
-    if "color" in update_data and update_data["color"].lower() not in ["black", "white"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Color must be 'black' or 'white'"
-        )
-    
-    # Validate size if provided
-    if "size" in update_data and update_data["size"].upper() not in ["S", "M", "L", "XL"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Size must be 'S', 'M', 'L', or 'XL'"
+            detail=str(exc)
         )
     
     for key, value in update_data.items():
-        if key == "category" and value:
-            value = value.lower()
-        elif key == "color" and value:
-            value = value.lower()
-        elif key == "size" and value:
-            value = value.upper()
         setattr(db_product, key, value)
     
-    db.commit()
-    db.refresh(db_product)
+    if update_data.keys() & {"name", "category", *STYLE_ATTRIBUTES}:
+        style_row = {key: getattr(db_product, key) for key in ("name", "category", *STYLE_ATTRIBUTES)}
+        await assign_styles(db, [style_row])
+        db_product.style_id = style_row["style_id"]
+    
+    await catalog_version.bump(db)
+    await db.commit()
+    read_replicas.pin_to_primary(request, response)
+    await db.refresh(db_product)
     return db_product
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_current_admin)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin)
 ):
     """Delete product (ADMIN only)"""
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = await db.get(Product, product_id)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    db.delete(db_product)
-    db.commit()
+    # Holds on the product go with it
+    await db.execute(delete(StockHold).where(StockHold.product_id == product_id))
+    await db.execute(delete(Product).where(Product.id == product_id))
+    await catalog_version.bump(db)
+    await db.commit()
+    read_replicas.pin_to_primary(request, response)
     return None
 
@@ -0,0 +1,139 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import List
+from app.database import get_db, get_read_db, read_replicas
+from app.models import Product, StockHold
+from app.schemas import ReservationRequest, ReservationResponse
+from app.auth.jwt import Principal, get_current_user
+from app.core.catalog import catalog_version
+from app.core.reservations import claim_holds, hold_expiry, release_holds
+from app.core.serialization import dumps, json_response
+
+router = APIRouter(prefix="/reservations", tags=["Reservations"])
+
+
+def _insufficient_stock(name: str, available: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Insufficient stock for product '{name}'. Available: {max(available, 0)}"
+    )
+
+
+@router.get("", response_model=List[ReservationResponse])
+async def get_my_reservations(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the current user's active stock holds (PROTECTED - auth required)
+    """
+    rows = await db.execute(
+        select(StockHold.product_id, StockHold.quantity, StockHold.expires_at, Product.available)
+        .join(Product, Product.id == StockHold.product_id)
+        .where(StockHold.user_id == current_user.id, StockHold.expires_at > datetime.now(timezone.utc))
+        .order_by(StockHold.id)
+    )
+    return json_response(dumps([row._asdict() for row in rows]))
+
+
+@router.put("/{product_id}", response_model=ReservationResponse)
+async def reserve_stock(
+    product_id: int,
+    reservation: ReservationRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Hold `quantity` units of a product for the current user's cart (PROTECTED - auth required)
+    Replaces any previous hold on the product and restarts its RESERVATION_TTL.
+    """
+    # Fail fast without taking a write lock when the product is missing or
+    # already short; the guarded UPDATE below is authoritative
+    product = (await db.execute(
+        select(Product.name, Product.stock - Product.reserved, StockHold.quantity)
+        .outerjoin(StockHold, (StockHold.product_id == Product.id) & (StockHold.user_id == current_user.id))
+        .where(Product.id == product_id)
+    )).first()
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    name, unreserved, previous = product
+    if unreserved + (previous or 0) < reservation.quantity:
+        raise _insufficient_stock(name, unreserved + (previous or 0))
+    
+    # The previous hold's units are still counted in reserved; only the difference moves.
+    # A hold created meanwhile by the same user fails the INSERT below instead
+    held = 0
+    if previous is not None:
+        held = (await claim_holds(db, current_user.id, [product_id])).get(product_id, 0)
+    delta = reservation.quantity - held
+    
+    query = update(Product).where(Product.id == product_id)
+    if delta > 0:
+        query = query.where(Product.stock - Product.reserved >= delta)
+    row = (await db.execute(
+        query.values(reserved=Product.reserved + delta)
+        .returning(Product.stock - Product.reserved)
+        .execution_options(synchronize_session=False)
+    )).first()
+    
+    if row is None:
+        available = await db.scalar(
+            select(Product.stock - Product.reserved + held).where(Product.id == product_id)
+        )
+        await db.rollback()
+        raise _insufficient_stock(name, available or 0)
+    
+    try:
+        expires_at = await db.scalar(
+            insert(StockHold)
+            .values(
+                user_id=current_user.id,
+                product_id=product_id,
+                quantity=reservation.quantity,
+                expires_at=hold_expiry(),
+            )
+            .returning(StockHold.expires_at)
+        )
+        await catalog_version.bump(db)
+        await db.commit()
+    except IntegrityError:
+        # Another request from the same user created the hold first
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Reservation was changed concurrently, please retry"
+        )
+    
+    response = json_response(dumps({
+        "product_id": product_id,
+        "quantity": reservation.quantity,
+        "expires_at": expires_at,
+        "available": max(row[0], 0),
+    }))
+    read_replicas.pin_to_primary(request, response)
+    return response
+
+
+@router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_reservation(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Release the current user's hold on a product (PROTECTED - auth required)
+    Releasing a product that is not held is a no-op.
+    """
+    await release_holds(db, StockHold.user_id == current_user.id, StockHold.product_id == product_id)
+    await db.commit()
+    read_replicas.pin_to_primary(request, response)
+    return None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -63,16 +63,89 @@ class ProductUpdate(BaseModel):
 
 class ProductResponse(ProductBase):
     id: int
+    available: int  # stock not held by carts
     created_at: datetime
+    style_id: Optional[int] = None
     
     class Config:
         from_attributes = True
 
 
+class ProductImportRow(ProductCreate):
+    id: Optional[int] = None
+
+
+class ProductImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ProductImportResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = []
+
+
+class ProductPage(BaseModel):
+    items: List[ProductResponse]
+    next_cursor: Optional[str] = None
+
+
+class ProductVariant(BaseModel):
+    """One SKU of a style; `id` is the product id used in carts and orders"""
+    id: int
+    color: str
+    size: str
+    price: float  # what checkout charges; may differ from the style's price
+    stock: int
+    available: int  # stock not held by carts
+
+
+class ProductStyleResponse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    price: float
+    category: str
+    image_url: Optional[str] = None
+    created_at: datetime
+    variants: List[ProductVariant]
+
+
+class ProductStylePage(BaseModel):
+    items: List[ProductStyleResponse]
+    next_cursor: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+    in_stock: int
+
+
+class ProductFacets(BaseModel):
+    category: List[FacetCount]
+    color: List[FacetCount]
+    size: List[FacetCount]
+
+
+# ============ Reservation Schemas ============
+class ReservationRequest(BaseModel):
+    quantity: int = Field(..., ge=1)
+
+
+class ReservationResponse(BaseModel):
+    product_id: int
+    quantity: int
+    expires_at: datetime
+    available: int  # units others can still reserve or buy
+
+
 # ============ Order Schemas ============
 class OrderItemCreate(BaseModel):
     product_id: int
-    quantity: int
+    quantity: int = Field(..., gt=0)
 
 
 class OrderItemResponse(BaseModel):
@@ -104,13 +177,24 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+class OrderPage(BaseModel):
+    items: List[OrderResponse]
+    next_cursor: Optional[str] = None
+
+
 class OrderListResponse(BaseModel):
     id: int
     total_amount: float
     status: str
     created_at: datetime
     items_count: int
+    thumbnail_url: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+
+class OrderSummaryPage(BaseModel):
+    items: List[OrderListResponse]
+    next_cursor: Optional[str] = None
+
@@ -0,0 +1,352 @@
+"""
+HTTP load and latency benchmark for the API routes.
+
+A generated dataset (see `seed_data.py --generate`) is loaded and then each
+scenario drives the app with a fixed number of requests at the given
+concurrency:
+
+    browse    GET /products with random filters, following next_cursor
+    detail    GET /products/{id}
+    login     POST /auth/dev-login
+    checkout  POST /orders
+    history   GET /orders/my, /orders/my/summary and /orders/{id}
+
+Targets: `asgi` calls `app.main:app` in-process through httpx.ASGITransport;
+`uvicorn` and `gunicorn` start a real server subprocess on a free local port
+against the same database. Throughput and p50/p95/p99 latency are reported
+per target, scenario and endpoint.
+
+Run from the backend directory:
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --target asgi uvicorn gunicorn --workers 4 --concurrency 32
+    python benchmarks/bench_api.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_api.py --baseline benchmarks/baseline.json --threshold 0.2
+
+With --baseline the run exits with status 1 if any endpoint's p95 latency
+rises, or its throughput falls, by more than --threshold (a fraction)
+relative to the baseline. A Postgres database given with --database-url
+must be empty; it is filled and left in place.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, '.')
+
+SCENARIO_NAMES = ["browse", "detail", "login", "checkout", "history"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--target", nargs="+", choices=["asgi", "uvicorn", "gunicorn"], default=["asgi"])
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIO_NAMES, default=SCENARIO_NAMES)
+    parser.add_argument("--requests", type=int, default=500, help="iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=25, help="unrecorded iterations per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2, help="server worker processes")
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="compare against this baseline JSON file")
+    parser.add_argument("--save-baseline", help="write this run's results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url or (
+    f"sqlite:///{tempfile.mkdtemp(prefix='ekart-api-bench-')}/api.db"
+)
+os.environ["DEV_MODE"] = "true"
+# Load generators send far more than any one client is allowed to
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx
+from sqlalchemy import select, update
+
+import seed_data
+from app.auth.jwt import create_access_token
+from app.database import engine, sync_engine
+from app.main import app
+from app.models import Product, User
+
+
+# Dataset
+
+def load_dataset():
+    seed_data.generate_dataset(seed_data.parse_args([
+        "--generate",
+        "--products", str(args.products),
+        "--users", str(args.users),
+        "--orders", str(args.orders),
+        "--seed", str(args.seed),
+    ]))
+    with sync_engine.begin() as connection:
+        # Checkouts should measure the write path, not run out of stock
+        connection.execute(update(Product).values(stock=1_000_000_000))
+        product_ids = connection.execute(select(Product.id)).scalars().all()
+        users = connection.execute(select(User.id, User.email)).all()
+    return product_ids, users
+
+
+class Context:
+    def __init__(self, product_ids, users):
+        self.product_ids = product_ids
+        self.users = users
+        self.tokens = {user_id: create_access_token({"sub": str(user_id)}) for user_id, _ in users}
+        self.recording = False
+        self.samples = {}  # endpoint -> [latency seconds]
+        self.errors = {}  # endpoint -> count
+
+    def auth(self, rng):
+        user_id, _ = rng.choice(self.users)
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+
+async def timed(ctx, client, endpoint, method, url, ok=(200,), **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        failed = response.status_code not in ok
+    except httpx.HTTPError:
+        response, failed = None, True
+    elapsed = time.perf_counter() - started
+    if ctx.recording:
+        ctx.samples.setdefault(endpoint, []).append(elapsed)
+        if failed:
+            ctx.errors[endpoint] = ctx.errors.get(endpoint, 0) + 1
+    return None if failed else response
+
+
+# Scenarios
+
+async def browse(ctx, client, rng):
+    params = {"limit": 20}
+    if rng.random() < 0.7:
+        params["category"] = rng.choice(["t-shirt", "hoodie"])
+    if rng.random() < 0.5:
+        params["color"] = rng.choice(["black", "white"])
+    if rng.random() < 0.3:
+        params["size"] = rng.choice(["S", "M", "L", "XL"])
+    for _ in range(rng.randint(1, 3)):
+        response = await timed(ctx, client, "GET /products", "GET", "/products", params=params)
+        cursor = response and response.json()["next_cursor"]
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+
+async def detail(ctx, client, rng):
+    product_id = rng.choice(ctx.product_ids)
+    await timed(ctx, client, "GET /products/{id}", "GET", f"/products/{product_id}")
+
+
+async def login(ctx, client, rng):
+    _, email = rng.choice(ctx.users)
+    await timed(ctx, client, "POST /auth/dev-login", "POST", "/auth/dev-login",
+                json={"email": email, "name": "Load Test User"})
+
+
+async def checkout(ctx, client, rng):
+    lines = rng.sample(ctx.product_ids, rng.randint(1, 3))
+    items = [{"product_id": product_id, "quantity": rng.randint(1, 2)} for product_id in lines]
+    await timed(ctx, client, "POST /orders", "POST", "/orders", ok=(201,),
+                json={"items": items, "shipping_address": "1 Bench Street"}, headers=ctx.auth(rng))
+
+
+async def history(ctx, client, rng):
+    headers = ctx.auth(rng)
+    await timed(ctx, client, "GET /orders/my", "GET", "/orders/my", params={"limit": 20}, headers=headers)
+    response = await timed(ctx, client, "GET /orders/my/summary", "GET", "/orders/my/summary",
+                           params={"limit": 20}, headers=headers)
+    orders = response.json()["items"] if response else []
+    if orders:
+        order_id = rng.choice(orders)["id"]
+        await timed(ctx, client, "GET /orders/{id}", "GET", f"/orders/{order_id}", headers=headers)
+
+
+SCENARIOS = {
+    "browse": browse,
+    "detail": detail,
+    "login": login,
+    "checkout": checkout,
+    "history": history,
+}
+
+
+# Runner
+
+async def run_scenario(ctx, client, name):
+    rng = random.Random(f"{args.seed}-{name}")
+    step = SCENARIOS[name]
+
+    async def drive(iterations):
+        remaining = iter(range(iterations))
+
+        async def worker():
+            for _ in remaining:
+                await step(ctx, client, rng)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    ctx.recording = False
+    await drive(args.warmup)
+    ctx.samples, ctx.errors, ctx.recording = {}, {}, True
+    started = time.perf_counter()
+    await drive(args.requests)
+    elapsed = time.perf_counter() - started
+
+    return {
+        endpoint: summarize(latencies, ctx.errors.get(endpoint, 0), elapsed)
+        for endpoint, latencies in sorted(ctx.samples.items())
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(latencies, errors, elapsed):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(target, port):
+    if target == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "gunicorn", "app.main:app", "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(args.workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning"]
+
+
+async def wait_until_ready(base_url, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def run_target(ctx, target):
+    process = None
+    if target == "asgi":
+        client_kwargs = {"transport": httpx.ASGITransport(app=app), "base_url": "http://bench"}
+    else:
+        port = free_port()
+        process = subprocess.Popen(server_command(target, port), env=os.environ.copy())
+        client_kwargs = {"base_url": f"http://127.0.0.1:{port}"}
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        if process:
+            await wait_until_ready(client_kwargs["base_url"], process)
+        async with httpx.AsyncClient(timeout=60, limits=limits, **client_kwargs) as client:
+            return {name: await run_scenario(ctx, client, name) for name in args.scenario}
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def print_results(target, results):
+    print(f"\n[{target}] concurrency {args.concurrency}, {args.requests} iterations per scenario")
+    print(f"  {'scenario':<10} {'endpoint':<24} {'requests':>8} {'errors':>6} "
+          f"{'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for scenario, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            print(f"  {scenario:<10} {endpoint:<24} {stats['requests']:>8} {stats['errors']:>6} "
+                  f"{stats['throughput']:>9.1f} {stats['p50_ms']:>8.2f} "
+                  f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+
+def compare(results, baseline) -> list:
+    """Return a description of every endpoint that regressed beyond the threshold"""
+    regressions = []
+    for target, scenarios in results.items():
+        for scenario, endpoints in scenarios.items():
+            for endpoint, stats in endpoints.items():
+                base = baseline.get(target, {}).get(scenario, {}).get(endpoint)
+                if not base:
+                    continue
+                label = f"[{target}] {scenario} {endpoint}"
+                if stats["p95_ms"] > base["p95_ms"] * (1 + args.threshold):
+                    regressions.append(f"{label}: p95 {base['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+                if stats["throughput"] < base["throughput"] * (1 - args.threshold):
+                    regressions.append(
+                        f"{label}: throughput {base['throughput']:.1f} -> {stats['throughput']:.1f} req/s"
+                    )
+    return regressions
+
+
+async def main():
+    product_ids, users = load_dataset()
+    ctx = Context(product_ids, users)
+
+    results = {}
+    for target in args.target:
+        results[target] = await run_target(ctx, target)
+        print_results(target, results[target])
+
+    await engine.dispose()
+    sync_engine.dispose()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "database": engine.dialect.name,
+                    "concurrency": args.concurrency,
+                    "requests": args.requests,
+                    "workers": args.workers,
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions above {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark concurrent request throughput of a single worker (one event loop)
+with the async database layer versus the old blocking session pattern.
+
+Every request runs one query that takes --query-ms milliseconds inside the
+database. With a blocking session inside an `async def` handler the event
+loop stalls for the duration of the query, so throughput stays flat as
+concurrency grows. With the async session the loop keeps serving other
+requests while queries are in flight.
+
+Run from the backend directory:
+    python benchmarks/bench_async_db.py
+    python benchmarks/bench_async_db.py --concurrency 1 10 50 --requests 200 --query-ms 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+# Point the app at a throwaway SQLite database before it is imported
+_tmp_dir = tempfile.mkdtemp(prefix="ekart-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/bench.db"
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal, engine, get_db, sync_engine
+
+
+def _bench_sleep(ms):
+    """SQL function that blocks the calling connection for `ms` milliseconds"""
+    time.sleep(ms / 1000)
+    return ms
+
+
+@event.listens_for(engine.sync_engine, "connect")
+@event.listens_for(sync_engine, "connect")
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("bench_sleep", 1, _bench_sleep)
+
+
+bench_app = FastAPI()
+QUERY = text("SELECT bench_sleep(:ms)")
+
+
+@bench_app.get("/async")
+async def async_route(ms: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(QUERY, {"ms": ms})
+    return {"slept": result.scalar()}
+
+
+@bench_app.get("/blocking")
+async def blocking_route(ms: int):
+    # The pre-async pattern: sync session called from an async handler
+    db = SessionLocal()
+    try:
+        return {"slept": db.execute(QUERY, {"ms": ms}).scalar()}
+    finally:
+        db.close()
+
+
+async def run_load(path: str, concurrency: int, total_requests: int, query_ms: int) -> float:
+    """Fire `total_requests` requests with `concurrency` in flight; return req/s"""
+    transport = httpx.ASGITransport(app=bench_app)
+    remaining = iter(range(total_requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path, params={"ms": query_ms})
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return total_requests / elapsed
+
+
+async def main(args):
+    print(f"Per-worker throughput, {args.requests} requests, {args.query_ms} ms per query")
+    print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14} {'speedup':>9}")
+    for concurrency in args.concurrency:
+        blocking = await run_load("/blocking", concurrency, args.requests, args.query_ms)
+        non_blocking = await run_load("/async", concurrency, args.requests, args.query_ms)
+        print(f"{concurrency:>12} {blocking:>16.1f} {non_blocking:>14.1f} {non_blocking / blocking:>8.1f}x")
+
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--query-ms", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,173 @@
+"""
+CPU cost of the JSON response path for the list endpoints.
+
+Two measurements against a generated dataset:
+    serialize  one page read and encoded the old way (ORM entities validated
+               by FastAPI's response_model, dumped and encoded with stdlib
+               json) and the current way (column projection + orjson)
+    endpoint   whole requests through the ASGI app (routing, auth, DB, JSON
+               and compression), with the body caches cleared so every
+               request is serialized and compressed again; the gzip column
+               includes the in-process client's decompression
+
+Costs are CPU time per request (time.process_time), so they do not depend on
+I/O waits or on how busy the machine is with other processes.
+
+Run from the backend directory:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --requests 500 --page-size 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per measurement")
+    parser.add_argument("--page-size", type=int, default=100, help="products per page (max 100)")
+    parser.add_argument("--orders-page", type=int, default=20, help="orders per history page")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ekart-serialize-')}/serialize.db"
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+import seed_data
+from app.auth.jwt import create_access_token
+from app.core.catalog import catalog_bodies
+from app.core.compression import compressed_bodies
+from app.core.serialization import dumps
+from app.database import AsyncSessionLocal, engine, sync_engine
+from app.main import app
+from app.models import Order, OrderItem, Product
+from app.routes.orders import ORDER_COLUMNS, ORDER_FIELDS, load_order_items, my_orders_query
+from app.routes.products import PRODUCT_FIELDS, product_list_query
+from app.schemas import OrderPage, ProductPage
+
+PRODUCT_PAGE_FIELD = create_response_field(name="ProductPage", type_=ProductPage, mode="serialization")
+ORDER_PAGE_FIELD = create_response_field(name="OrderPage", type_=OrderPage, mode="serialization")
+
+
+def load_dataset():
+    seed_data.generate_dataset(seed_data.parse_args([
+        "--generate", "--products", "2000", "--users", "50", "--orders", "3000",
+        "--items-per-order", "1:2,2:3,3:2,5:1",
+    ]))
+    with sync_engine.connect() as connection:
+        return connection.execute(
+            select(Order.user_id).group_by(Order.user_id).order_by(func.count().desc()).limit(1)
+        ).scalar()
+
+
+# Old path: entities through the response_model, as FastAPI does for a returned object
+
+async def products_legacy(db, limit):
+    products = (await db.scalars(select(Product).order_by(Product.id).limit(limit))).all()
+    content = await serialize_response(field=PRODUCT_PAGE_FIELD, response_content={"items": products})
+    return JSONResponse(content).body
+
+
+async def orders_legacy(db, user_id, limit):
+    orders = (await db.scalars(
+        select(Order).where(Order.user_id == user_id)
+        .order_by(Order.created_at.desc(), Order.id.desc()).limit(limit)
+        .options(selectinload(Order.items).selectinload(OrderItem.product))
+    )).all()
+    content = await serialize_response(field=ORDER_PAGE_FIELD, response_content={"items": orders})
+    return JSONResponse(content).body
+
+
+# Current path: column projection straight to dicts, encoded by orjson
+
+async def products_projected(db, limit):
+    rows = (await db.execute(product_list_query(limit=limit))).all()
+    return dumps({"items": [dict(zip(PRODUCT_FIELDS, row)) for row in rows[:limit]], "next_cursor": None})
+
+
+async def orders_projected(db, user_id, limit):
+    rows = (await db.execute(my_orders_query(user_id, None, limit).with_only_columns(*ORDER_COLUMNS))).all()
+    orders = [dict(zip(ORDER_FIELDS, row)) for row in rows[:limit]]
+    items = await load_order_items(db, [order["id"] for order in orders])
+    for order in orders:
+        order["items"] = items[order["id"]]
+    return dumps({"items": orders, "next_cursor": None})
+
+
+async def cpu_per_call(call, repeat):
+    await call()  # warm up statement caches and lazily built validators
+    started = time.process_time()
+    for _ in range(repeat):
+        await call()
+    return (time.process_time() - started) / repeat * 1000
+
+
+async def measure_serialization(user_id):
+    print(f"Serialize one page ({args.requests} runs, CPU ms per page)")
+    print(f"  {'page':<28} {'old':>8} {'new':>8} {'speedup':>8}")
+    async with AsyncSessionLocal() as db:
+        cases = [
+            (f"products x{args.page_size}",
+             lambda: products_legacy(db, args.page_size), lambda: products_projected(db, args.page_size)),
+            (f"orders x{args.orders_page} (with items)",
+             lambda: orders_legacy(db, user_id, args.orders_page),
+             lambda: orders_projected(db, user_id, args.orders_page)),
+        ]
+        for label, legacy, projected in cases:
+            old = await cpu_per_call(legacy, args.requests)
+            new = await cpu_per_call(projected, args.requests)
+            print(f"  {label:<28} {old:8.3f} {new:8.3f} {old / new:7.1f}x")
+
+
+async def measure_endpoints(user_id):
+    buyer = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    endpoints = [
+        ("GET /products", "/products", {"limit": args.page_size}, {}),
+        ("GET /orders/my", "/orders/my", {"limit": args.orders_page}, buyer),
+        ("GET /orders/my/summary", "/orders/my/summary", {"limit": args.orders_page}, buyer),
+    ]
+    print(f"\nWhole requests ({args.requests} runs, CPU ms per request)")
+    print(f"  {'endpoint':<28} {'identity':>9} {'gzip':>9} {'bytes':>9} {'gzipped':>9}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for label, path, params, headers in endpoints:
+            results = []
+            for encoding in ("identity", "gzip"):
+                request_headers = {**headers, "Accept-Encoding": encoding}
+
+                async def call():
+                    catalog_bodies.clear()
+                    compressed_bodies.clear()
+                    response = await client.get(path, params=params, headers=request_headers)
+                    response.raise_for_status()
+                    return response
+
+                cpu = await cpu_per_call(call, args.requests)
+                response = await call()
+                results.append((cpu, len(response.content) if encoding == "identity" else
+                                int(response.headers.get("content-length", len(response.content)))))
+            (plain_cpu, plain_size), (gzip_cpu, gzip_size) = results
+            print(f"  {label:<28} {plain_cpu:9.3f} {gzip_cpu:9.3f} {plain_size:9d} {gzip_size:9d}")
+
+
+async def main():
+    user_id = load_dataset()
+    await measure_serialization(user_id)
+    await measure_endpoints(user_id)
+    await engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
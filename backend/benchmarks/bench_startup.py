@@ -0,0 +1,131 @@
+"""
+Measure worker cold-start cost: importing `app.main` and booting a server.
+
+Each repetition runs in a fresh interpreter, as a newly spawned gunicorn
+worker would:
+    import   time to `import app.main` (module imports + create_app)
+    boot     time from spawning `uvicorn app.main:app` until /health answers
+
+The slowest imported modules (from `python -X importtime`) are listed so a
+new heavy top-level import is easy to spot.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --import-budget-ms 800
+
+Without DATABASE_URL the runs use a temporary SQLite database, migrated
+before timing. With --import-budget-ms the run exits with status 1 if the
+median import time exceeds the budget.
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="slowest modules to list (0 to skip)")
+    parser.add_argument("--skip-boot", action="store_true", help="only measure the import")
+    parser.add_argument("--import-budget-ms", type=float, help="fail if the median import exceeds this")
+    return parser.parse_args()
+
+
+def child_env():
+    env = os.environ.copy()
+    if "DATABASE_URL" not in env:
+        env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ekart-startup-')}/startup.db"
+        # The background loops started at boot query their tables, so create
+        # them first rather than timing (and logging) failed queries
+        subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=env, check=True, capture_output=True)
+    return env
+
+
+def measure_import(env) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_boot(env, timeout: float = 30.0) -> float:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not become ready")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def slowest_modules(env, top: int):
+    """(cumulative microseconds, module) for the slowest imports, outermost first per chain"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            rows.append((int(match.group(1)), len(match.group(2)), match.group(3)))
+    # Top-level imports of the app and its direct dependencies (nesting depth <= 2)
+    shallow = [(cumulative, name) for cumulative, depth, name in rows if depth <= 4]
+    return sorted(shallow, reverse=True)[:top]
+
+
+def summarize(label, samples):
+    ms = [sample * 1000 for sample in samples]
+    print(f"  {label:<7} median {statistics.median(ms):8.1f} ms   "
+          f"min {min(ms):8.1f} ms   max {max(ms):8.1f} ms   (n={len(ms)})")
+    return statistics.median(ms)
+
+
+def main():
+    args = parse_args()
+    env = child_env()
+
+    measure_import(env)  # warm the filesystem and bytecode caches
+    print(f"Worker startup, {args.repeat} fresh interpreters")
+    import_median = summarize("import", [measure_import(env) for _ in range(args.repeat)])
+    if not args.skip_boot:
+        summarize("boot", [measure_boot(env) for _ in range(args.repeat)])
+
+    if args.top:
+        print(f"\nSlowest imports (cumulative, top {args.top}):")
+        for cumulative, name in slowest_modules(env, args.top):
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    if args.import_budget_ms is not None and import_median > args.import_budget_ms:
+        print(f"\nMedian import {import_median:.1f} ms exceeds budget {args.import_budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
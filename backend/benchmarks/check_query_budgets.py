@@ -0,0 +1,151 @@
+"""
+Pin every API route to its expected number of SQL statements.
+
+Each route is called in-process against a generated dataset inside
+`assert_max_queries`, with the principal and catalog caches cleared first
+so the cold path is measured. A route that issues more statements than its
+budget - typically a new lazy load or a per-row query (N+1) - fails the
+run with the offending statement shapes listed.
+
+Budgets are set for data sizes where an N+1 would be obvious: order
+history pages hold 20 multi-item orders and the import sends 200 rows.
+
+Run from the backend directory:
+    python benchmarks/check_query_budgets.py
+
+Exits with status 1 if any route is over budget.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, '.')
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ekart-budgets-')}/budgets.db"
+os.environ["DEV_MODE"] = "true"
+
+import httpx
+from sqlalchemy import func, select, update
+
+import seed_data
+from app.auth.jwt import create_access_token, principal_cache
+from app.core.catalog import catalog_bodies, catalog_version
+from app.core.querycount import QueryBudgetExceeded, assert_max_queries
+from app.database import engine, sync_engine
+from app.main import app
+from app.models import Order, Product, User
+
+
+def load_dataset():
+    seed_data.generate_dataset(seed_data.parse_args([
+        "--generate", "--products", "400", "--users", "20", "--orders", "600",
+        "--items-per-order", "2:1,3:1,4:1", "--user-skew", "0",
+    ]))
+    with sync_engine.begin() as connection:
+        connection.execute(update(Product).values(stock=1_000_000))
+        connection.execute(update(User).where(User.id == 1).values(role="admin"))
+        busiest = connection.execute(
+            select(Order.user_id).group_by(Order.user_id).order_by(func.count().desc()).limit(1)
+        ).scalar()
+    return busiest
+
+
+async def main():
+    buyer_id = load_dataset()
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    buyer = {"Authorization": f"Bearer {create_access_token({'sub': str(buyer_id)})}"}
+    failures = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://budget") as client:
+        async def check(label, budget, method, url, expect=200, **kwargs):
+            principal_cache.clear()
+            catalog_version.invalidate()
+            catalog_bodies.clear()
+            try:
+                with assert_max_queries(budget, label) as stats:
+                    response = await client.request(method, url, **kwargs)
+            except QueryBudgetExceeded as exc:
+                failures.append(str(exc))
+                print(f"[FAIL] {label}")
+                return None
+            if response.status_code != expect:
+                failures.append(f"{label}: expected HTTP {expect}, got {response.status_code}")
+                print(f"[FAIL] {label} -> HTTP {response.status_code}")
+                return None
+            print(f"[ok]   {label}: {stats.count}/{budget} queries")
+            return response
+
+        new_product = {
+            "name": "Budget Tee", "price": 999, "stock": 10,
+            "category": "t-shirt", "color": "black", "size": "M",
+        }
+        import_body = "\n".join(
+            json.dumps({**new_product, "name": f"Budget Import {i}"}) for i in range(200)
+        )
+
+        # Auth
+        await check("POST /auth/dev-login", 1, "POST", "/auth/dev-login",
+                    json={"email": "loadtest2@example.com", "name": "Load Test User"})
+        await check("POST /auth/google (dev mode)", 3, "POST", "/auth/google", json={"token": "dev"})
+        await check("GET /auth/me", 1, "GET", "/auth/me", headers=buyer)
+
+        # Catalog
+        await check("GET /products", 2, "GET", "/products", params={"limit": 50})
+        await check("GET /products?filters", 2, "GET", "/products",
+                    params={"category": "hoodie", "color": "white", "size": "L"})
+        await check("GET /products/{id}", 2, "GET", "/products/1")
+        await check("GET /products/facets", 2, "GET", "/products/facets", params={"color": "black", "size": "M"})
+        await check("GET /products/search", 2, "GET", "/products/search",
+                    params={"q": "hoodie", "color": "white", "in_stock": "true"})
+        await check("GET /products/styles", 2, "GET", "/products/styles", params={"limit": 50})
+        await check("GET /products/styles?filters", 2, "GET", "/products/styles",
+                    params={"category": "hoodie", "color": "white", "size": "L"})
+        created = await check("POST /products", 6, "POST", "/products", expect=201,
+                              json=new_product, headers=admin)
+        product_id = created.json()["id"] if created else 1
+        await check("PUT /products/{id}", 7, "PUT", f"/products/{product_id}",
+                    json={"price": 1099}, headers=admin)
+        await check("POST /products/import (200 rows)", 6, "POST", "/products/import",
+                    content=import_body, headers={**admin, "content-type": "application/x-ndjson"})
+        await check("DELETE /products/{id}", 5, "DELETE", f"/products/{product_id}",
+                    expect=204, headers=admin)
+
+        # Reservations (the hold on product 2 is converted by the order below)
+        await check("PUT /reservations/{id}", 5, "PUT", "/reservations/7", json={"quantity": 1}, headers=buyer)
+        await check("PUT /reservations/{id} (replace)", 6, "PUT", "/reservations/7",
+                    json={"quantity": 2}, headers=buyer)
+        await check("GET /reservations", 2, "GET", "/reservations", headers=buyer)
+        await check("DELETE /reservations/{id}", 4, "DELETE", "/reservations/7", expect=204, headers=buyer)
+        await client.put("/reservations/2", json={"quantity": 1}, headers=buyer)
+
+        # Orders
+        cart = [{"product_id": product_id, "quantity": 1} for product_id in range(2, 7)]
+        await check("POST /orders (5 lines, 1 held)", 8, "POST", "/orders", expect=201,
+                    json={"items": cart, "shipping_address": "1 Budget Street"}, headers=buyer)
+        keyed = {**buyer, "Idempotency-Key": "budget-order-1"}
+        retry_body = {"items": [{"product_id": 8, "quantity": 1}]}
+        await check("POST /orders (Idempotency-Key)", 9, "POST", "/orders", expect=201,
+                    json=retry_body, headers=keyed)
+        await check("POST /orders (replayed key)", 1, "POST", "/orders", expect=201,
+                    json=retry_body, headers=keyed)
+        page = await check("GET /orders/my", 3, "GET", "/orders/my", params={"limit": 20}, headers=buyer)
+        await check("GET /orders/my/summary", 2, "GET", "/orders/my/summary",
+                    params={"limit": 20}, headers=buyer)
+        order_id = page.json()["items"][0]["id"] if page else 1
+        await check("GET /orders/{id}", 3, "GET", f"/orders/{order_id}", headers=buyer)
+
+    await engine.dispose()
+    sync_engine.dispose()
+
+    if failures:
+        print(f"\n{len(failures)} route(s) over budget or failing:")
+        for failure in failures:
+            print(failure)
+        sys.exit(1)
+    print("\nAll routes within their query budgets")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+"""
+Checks that rate limits are enforced per client and shared across workers.
+
+1. Through the app: one client IP sends --burst + 1 dev logins, and one user
+   sends --burst + 1 orders. The last request of each must get 429 with a
+   Retry-After header. Another IP and another user must still get through.
+   Replays of an Idempotency-Key must never be limited.
+2. Across processes: --workers processes hit the same bucket at once. With
+   the shared backend, the number of requests let through must stay within
+   one bucket's burst. With the memory backend, each worker has its own
+   bucket, so the report shows how much the total grows.
+
+Run from the backend directory:
+    python benchmarks/check_rate_limits.py
+    python benchmarks/check_rate_limits.py --backend redis --redis-url redis://localhost:6379/15
+
+The redis backend needs the `redis` package and a server speaking the Redis
+protocol. A throwaway local `redis-server --port 6399` (or valkey-server)
+works as a stand-in. Exits with status 1 if a limit is not enforced.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, '.')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("memory", "redis"), default="memory")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--burst", type=int, default=5, help="requests per hour allowed by every policy in the run")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20, help="requests per worker in the cross-process check")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ekart-ratelimit-')}/ratelimit.db"
+os.environ["DEV_MODE"] = "true"
+os.environ["RATE_LIMIT_ENABLED"] = "true"
+os.environ["RATE_LIMIT_BACKEND"] = args.backend
+os.environ["RATE_LIMIT_REDIS_URL"] = args.redis_url
+# Per hour, so no token is refilled while the check runs
+for policy in ("AUTH_GOOGLE", "AUTH_DEV_LOGIN", "ORDERS_CREATE"):
+    os.environ[f"RATE_LIMIT_{policy}"] = f"{args.burst}/hour"
+
+import httpx
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.auth.jwt import create_access_token
+from app.core.ratelimit import rate_limiter
+from app.database import Base, engine, sync_engine
+from app.main import app
+from app.models import Product, User
+
+CLIENT_IP = "203.0.113.1"
+
+
+def setup_data():
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"email": f"limited{i}@example.com", "name": f"Limited {i}", "role": "user"} for i in (1, 2, 3)
+        ])
+        connection.execute(insert(Product).values(
+            name="Limited Tee", price=999, stock=1000, category="t-shirt", color="black", size="M",
+        ))
+
+
+async def send(ip, method, url, **kwargs):
+    transport = httpx.ASGITransport(app=app, client=(ip, 50000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://ratelimit") as client:
+        return await client.request(method, url, **kwargs)
+
+
+async def check_burst(label, method, url, other_ip=CLIENT_IP, other=None, **kwargs):
+    """--burst requests pass, the next one is rejected, another client still passes"""
+    statuses = [(await send(CLIENT_IP, method, url, **kwargs)).status_code for _ in range(args.burst)]
+    rejected = await send(CLIENT_IP, method, url, **kwargs)
+    other = await send(other_ip, method, url, **(other or kwargs))
+
+    retry_after = rejected.headers.get("Retry-After", "")
+    ok = (
+        429 not in statuses
+        and rejected.status_code == 429
+        and retry_after.isdigit() and int(retry_after) > 0
+        and other.status_code != 429
+    )
+    print(f"[{'ok' if ok else 'FAIL':<4}] {label}: {args.burst} x {statuses[-1]}, then {rejected.status_code} "
+          f"(Retry-After {retry_after or '-'}s); other client {other.status_code}")
+    return ok
+
+
+async def check_replays(token):
+    """One keyed order, then --burst + 1 retries of it: all replayed, none limited"""
+    headers = {"Authorization": token, "Idempotency-Key": "check-replays"}
+    order = {"items": [{"product_id": 1, "quantity": 1}]}
+    responses = [await send(CLIENT_IP, "POST", "/orders", json=order, headers=headers)
+                 for _ in range(args.burst + 2)]
+    statuses = [response.status_code for response in responses]
+    replayed = sum(response.headers.get("Idempotency-Replayed") == "true" for response in responses)
+    ok = set(statuses) == {201} and replayed == args.burst + 1
+    print(f"[{'ok' if ok else 'FAIL':<4}] POST /orders replays: {len(statuses)} x {sorted(set(statuses))}, "
+          f"{replayed} replayed")
+    return ok
+
+
+def hammer(key: str) -> int:
+    """Worker process: send --requests checks against one bucket, return how many passed"""
+    rate_limiter._backend = None  # do not reuse a connection made before the fork
+
+    async def run():
+        async def one():
+            try:
+                await rate_limiter.check("orders_create", key)
+                return 1
+            except HTTPException:
+                return 0
+        passed = sum(await asyncio.gather(*(one() for _ in range(args.requests))))
+        await rate_limiter.close()
+        return passed
+
+    return asyncio.run(run())
+
+
+async def main():
+    setup_data()
+    # Fail before anything else if the shared store cannot be reached
+    if args.backend == "redis":
+        try:
+            await rate_limiter.backend._client.ping()
+        except Exception as exc:
+            print(f"Cannot reach {args.redis_url}: {exc!r}")
+            sys.exit(1)
+
+    print(f"Policies: {args.burst}/hour, backend {args.backend}")
+    first, second, third = (f"Bearer {create_access_token({'sub': str(user_id)})}" for user_id in (1, 2, 3))
+    order = {"items": [{"product_id": 999999, "quantity": 1}]}
+    results = [
+        await check_burst("POST /auth/dev-login per IP", "POST", "/auth/dev-login",
+                          other_ip="203.0.113.2", json={"email": "limited1@example.com"}),
+        await check_burst("POST /orders per user", "POST", "/orders",
+                          json=order, headers={"Authorization": first},
+                          other={"json": order, "headers": {"Authorization": second}}),
+        await check_replays(third),
+    ]
+    await rate_limiter.close()
+
+    key = f"check:{uuid.uuid4().hex}"
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        passed = list(pool.map(hammer, [key] * args.workers))
+    total = sum(passed)
+    shared = total <= args.burst
+    print(f"[{'ok' if shared or args.backend == 'memory' else 'FAIL':<4}] {args.workers} workers x "
+          f"{args.requests} requests on one bucket: {total} passed {passed} "
+          f"({'one shared bucket' if shared else f'{args.burst} per worker'})")
+    if args.backend == "redis":
+        results.append(shared)
+
+    await engine.dispose()
+    sync_engine.dispose()
+    if not all(results):
+        sys.exit(1)
+    print("Rate limits enforced")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
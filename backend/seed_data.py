@@ -2,15 +2,31 @@
 Seed script to populate the database with sample products.
 Run this after setting up the database:
     python seed_data.py
+
+Generator mode builds a large, reproducible dataset for load testing:
+    python seed_data.py --generate --products 100000 --users 50000 --orders 1000000 --seed 42
+
+Rows are appended after any existing data and written in batches with
+multi-row INSERTs, or with COPY on PostgreSQL (disable with --no-copy).
+The same arguments and seed always produce the same rows.
 """
+import argparse
+import csv
+import io
+import itertools
+import random
 import sys
+import time
+from datetime import datetime, timedelta
 sys.path.insert(0, '.')
 
-from app.database import SessionLocal, engine, Base
-from app.models import Product, User
+from sqlalchemy import func, insert, select, text
+
+from app.database import SessionLocal, sync_engine, Base
+from app.models import Order, OrderItem, Product, User
 
 # Create tables
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=sync_engine)
 
 # Sample products data
 products_data = [
@@ -237,6 +253,8 @@ def seed_database():
             product = Product(**product_data)
             db.add(product)
         
+        db.commit()
+        link_product_styles(db.connection())
         db.commit()
         print(f"Successfully added {len(products_data)} products to the database!")
         
@@ -247,6 +265,243 @@ def seed_database():
         db.close()
 
 
+def link_product_styles(connection):
+    """Group products without a style into styles by (name, category)"""
+    connection.execute(text(
+        """
+        INSERT INTO product_styles (name, category, description, price, image_url)
+        SELECT p.name, p.category, p.description, p.price, p.image_url
+        FROM products p
+        WHERE p.id IN (SELECT MIN(id) FROM products WHERE style_id IS NULL GROUP BY name, category)
+          AND NOT EXISTS (
+            SELECT 1 FROM product_styles s WHERE s.name = p.name AND s.category = p.category
+          )
+        """
+    ))
+    connection.execute(text(
+        """
+        UPDATE products SET style_id = (
+            SELECT s.id FROM product_styles s
+            WHERE s.name = products.name AND s.category = products.category
+        )
+        WHERE style_id IS NULL
+        """
+    ))
+
+
+# Generator mode
+GENERATED_STYLES = [
+    # (category, style name, base price)
+    ("t-shirt", "Essential Tee", 799),
+    ("t-shirt", "Premium Tee", 1299),
+    ("t-shirt", "Oversized Tee", 999),
+    ("hoodie", "Comfort Hoodie", 1999),
+    ("hoodie", "Elite Hoodie", 2999),
+    ("hoodie", "Zip Hoodie", 2499),
+]
+GENERATED_COLORS = ["black", "white"]
+GENERATED_SIZES = ["S", "M", "L", "XL"]
+GENERATED_STATUSES = "pending:10,confirmed:15,shipped:20,delivered:50,cancelled:5"
+GENERATED_EPOCH = datetime(2025, 1, 1)  # fixed so the same seed gives the same timestamps
+
+
+def parse_distribution(spec: str, value_type=int):
+    """Parse 'value:weight,...' into (values, cumulative weights)"""
+    values, weights = [], []
+    for part in spec.split(","):
+        value, _, weight = part.partition(":")
+        values.append(value_type(value.strip()))
+        weights.append(float(weight or 1))
+    return values, list(itertools.accumulate(weights))
+
+
+def zipf_weights(count: int, skew: float):
+    """Cumulative weights where rank r gets 1 / r**skew (skew 0 = uniform)"""
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def next_id(connection, model) -> int:
+    return (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def write_rows(connection, model, columns, rows, use_copy: bool):
+    """Bulk insert one batch: COPY on PostgreSQL, executemany otherwise"""
+    if not rows:
+        return
+    if use_copy:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        cursor.close()
+    else:
+        connection.execute(insert(model), [dict(zip(columns, row)) for row in rows])
+
+
+def batched(rows, size: int):
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def generate_products(rng, first_id: int, count: int):
+    """Styles in every color, each color offered in all sizes"""
+    variants = len(GENERATED_COLORS) * len(GENERATED_SIZES)
+    for offset in range(count):
+        style_no, variant = divmod(offset, variants)
+        category, style, base_price = GENERATED_STYLES[style_no % len(GENERATED_STYLES)]
+        color = GENERATED_COLORS[variant // len(GENERATED_SIZES)]
+        size = GENERATED_SIZES[variant % len(GENERATED_SIZES)]
+        price = base_price + 100 * (style_no // len(GENERATED_STYLES) % 5)
+        yield (
+            first_id + offset,
+            f"{style} {style_no + 1}",
+            f"Generated {color} {category}, style {style_no + 1}.",
+            price,
+            rng.randint(0, 200),
+            category,
+            color,
+            size,
+            None,
+        )
+
+
+def generate_users(first_id: int, count: int):
+    for user_id in range(first_id, first_id + count):
+        yield user_id, f"loadtest{user_id}@example.com", f"Load Test User {user_id}", "user"
+
+
+def generate_orders(rng, args, first_order_id, first_item_id, user_ids, product_ids, prices):
+    """Yield (order rows, item rows) per batch of orders"""
+    user_weights = zipf_weights(len(user_ids), args.user_skew)
+    product_weights = zipf_weights(len(product_ids), args.product_skew)
+    item_counts, item_weights = parse_distribution(args.items_per_order)
+    quantities, quantity_weights = parse_distribution(args.quantity)
+    statuses, status_weights = parse_distribution(GENERATED_STATUSES, str)
+    step = timedelta(days=args.days) / max(args.orders, 1)
+    start = GENERATED_EPOCH - timedelta(days=args.days)
+    
+    item_id = first_item_id
+    for batch_start in range(0, args.orders, args.batch_size):
+        batch_size = min(args.batch_size, args.orders - batch_start)
+        buyers = rng.choices(user_ids, cum_weights=user_weights, k=batch_size)
+        order_rows, item_rows = [], []
+        for offset, user_id in enumerate(buyers):
+            order_no = batch_start + offset
+            order_id = first_order_id + order_no
+            wanted = rng.choices(item_counts, cum_weights=item_weights)[0]
+            # Popular products repeat; keep each product once per order
+            picks = dict.fromkeys(rng.choices(range(len(product_ids)), cum_weights=product_weights, k=wanted))
+            total = 0
+            for index in picks:
+                quantity = rng.choices(quantities, cum_weights=quantity_weights)[0]
+                total += prices[index] * quantity
+                item_rows.append((item_id, order_id, product_ids[index], quantity, prices[index]))
+                item_id += 1
+            created_at = start + step * order_no + timedelta(seconds=rng.randint(0, 59))
+            order_rows.append((
+                order_id,
+                user_id,
+                total,
+                rng.choices(statuses, cum_weights=status_weights)[0],
+                f"{order_id} Load Test Street, Test City",
+                created_at.replace(microsecond=0),
+            ))
+        yield order_rows, item_rows
+
+
+def reset_sequences(connection):
+    """Explicit ids bypass PostgreSQL sequences; move them past the new rows"""
+    for model in (User, Product, Order, OrderItem):
+        table = model.__tablename__
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def generate_dataset(args):
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    
+    with sync_engine.begin() as connection:
+        use_copy = connection.dialect.name == "postgresql" and not args.no_copy
+        first_product = next_id(connection, Product)
+        first_user = next_id(connection, User)
+        first_order = next_id(connection, Order)
+        first_item = next_id(connection, OrderItem)
+    
+    def load(model, columns, rows, label):
+        written = 0
+        for batch in batched(rows, args.batch_size):
+            with sync_engine.begin() as connection:
+                write_rows(connection, model, columns, batch, use_copy)
+            written += len(batch)
+        print(f"  {label}: {written} rows ({time.perf_counter() - started:.1f}s)")
+    
+    print(f"Generating with seed {args.seed} ({'COPY' if use_copy else 'batched INSERT'})")
+    product_columns = ("id", "name", "description", "price", "stock", "category", "color", "size", "image_url")
+    products = list(generate_products(rng, first_product, args.products))
+    load(Product, product_columns, products, "products")
+    with sync_engine.begin() as connection:
+        link_product_styles(connection)
+    load(User, ("id", "email", "name", "role"), generate_users(first_user, args.users), "users")
+    
+    if args.orders and products and args.users:
+        product_ids = [row[0] for row in products]
+        prices = [row[3] for row in products]
+        user_ids = list(range(first_user, first_user + args.users))
+        order_columns = ("id", "user_id", "total_amount", "status", "shipping_address", "created_at")
+        item_columns = ("id", "order_id", "product_id", "quantity", "price")
+        order_count = item_count = 0
+        for order_rows, item_rows in generate_orders(
+            rng, args, first_order, first_item, user_ids, product_ids, prices
+        ):
+            with sync_engine.begin() as connection:
+                write_rows(connection, Order, order_columns, order_rows, use_copy)
+                write_rows(connection, OrderItem, item_columns, item_rows, use_copy)
+            order_count += len(order_rows)
+            item_count += len(item_rows)
+        print(f"  orders: {order_count} rows, order_items: {item_count} rows "
+              f"({time.perf_counter() - started:.1f}s)")
+    
+    with sync_engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            reset_sequences(connection)
+        connection.execute(text("ANALYZE"))
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generate", action="store_true", help="generate a synthetic dataset instead of the sample catalog")
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--items-per-order", default="1:45,2:30,3:15,4:7,6:3",
+                        help="distribution of line items per order as count:weight,...")
+    parser.add_argument("--quantity", default="1:80,2:15,3:5",
+                        help="distribution of quantity per line item as quantity:weight,...")
+    parser.add_argument("--user-skew", type=float, default=1.0,
+                        help="Zipf exponent for orders per user (0 = uniform)")
+    parser.add_argument("--product-skew", type=float, default=0.8,
+                        help="Zipf exponent for product popularity (0 = uniform)")
+    parser.add_argument("--days", type=int, default=365, help="spread order dates over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per INSERT/COPY transaction")
+    parser.add_argument("--no-copy", action="store_true", help="use batched INSERTs on PostgreSQL too")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    seed_database()
+    args = parse_args()
+    if args.generate:
+        generate_dataset(args)
+    else:
+        seed_database()
 
@@ -1,8 +1,13 @@
 import { Link } from 'react-router-dom'
 
+// `product` is a style from GET /products/styles with its variants
 export default function ProductCard({ product }) {
+  const variant = product.variants.find((v) => v.available > 0) || product.variants[0]
+  const colors = [...new Set(product.variants.map((v) => v.color))]
+  const sizes = [...new Set(product.variants.filter((v) => v.available > 0).map((v) => v.size))]
+
   return (
-    <Link to={`/product/${product.id}`} className="group">
+    <Link to={`/product/${variant.id}`} className="group">
       <div className="product-card bg-aura-white rounded-lg overflow-hidden">
         {/* Image */}
         <div className="aspect-[3/4] overflow-hidden bg-aura-cream">
@@ -27,19 +32,23 @@ export default function ProductCard({ product }) {
                 {product.name}
               </h3>
               <p className="text-sm text-aura-silver capitalize">
-                {product.category} • {product.color}
+                {product.category} • {colors.join(' / ')}
               </p>
             </div>
             <span className="font-display text-lg font-semibold text-aura-black">
-              ₹{product.price.toLocaleString()}
+              ₹{variant.price.toLocaleString()}
             </span>
           </div>
           
-          {/* Size Badge */}
-          <div className="mt-2">
-            <span className="inline-block px-2 py-1 text-xs bg-aura-cream text-aura-charcoal rounded">
-              {product.size}
-            </span>
+          {/* Sizes in stock */}
+          <div className="mt-2 flex flex-wrap gap-1">
+            {sizes.length > 0 ? sizes.map((size) => (
+              <span key={size} className="inline-block px-2 py-1 text-xs bg-aura-cream text-aura-charcoal rounded">
+                {size}
+              </span>
+            )) : (
+              <span className="text-xs text-aura-silver">Out of stock</span>
+            )}
           </div>
         </div>
       </div>
@@ -1,5 +1,6 @@
 import { createContext, useContext, useState, useEffect } from 'react'
 import toast from 'react-hot-toast'
+import { reservationAPI } from '../services/api'
 
 const CartContext = createContext(null)
 
@@ -19,7 +20,32 @@ export function CartProvider({ children }) {
     localStorage.setItem('cart', JSON.stringify(items))
   }, [items])
 
-  const addToCart = (product, quantity = 1) => {
+  // Hold the units on the server so they are still there at checkout.
+  // Holds are best effort: checkout re-checks stock either way.
+  const reserve = async (productId, quantity) => {
+    try {
+      await reservationAPI.hold(productId, quantity)
+      return true
+    } catch (error) {
+      if (error.response?.status === 400) {
+        toast.error(error.response.data.detail)
+        return false
+      }
+      return true
+    }
+  }
+
+  const addToCart = async (product, quantity = 1) => {
+    // Holds are per product, so the new hold covers the quantity already in the cart
+    const inCart = items.find(
+      item => item.product.id === product.id && 
+              item.product.size === product.size &&
+              item.product.color === product.color
+    )
+    if (!(await reserve(product.id, (inCart?.quantity || 0) + quantity))) {
+      return
+    }
+
     setItems(prevItems => {
       const existingItem = prevItems.find(
         item => item.product.id === product.id && 
@@ -44,6 +70,7 @@ export function CartProvider({ children }) {
   }
 
   const removeFromCart = (productId, size, color) => {
+    reservationAPI.release(productId).catch(() => {})
     setItems(prevItems => 
       prevItems.filter(item => 
         !(item.product.id === productId && 
@@ -54,12 +81,16 @@ export function CartProvider({ children }) {
     toast.success('Removed from cart')
   }
 
-  const updateQuantity = (productId, size, color, quantity) => {
+  const updateQuantity = async (productId, size, color, quantity) => {
     if (quantity <= 0) {
       removeFromCart(productId, size, color)
       return
     }
 
+    if (!(await reserve(productId, quantity))) {
+      return
+    }
+
     setItems(prevItems =>
       prevItems.map(item =>
         item.product.id === productId && 
@@ -26,7 +26,7 @@ export default function AdminProducts() {
     try {
       setLoading(true)
       const response = await productAPI.getAll()
-      setProducts(response.data)
+      setProducts(response.data.items)
     } catch (error) {
       console.error('Error fetching products:', error)
       toast.error('Failed to load products')
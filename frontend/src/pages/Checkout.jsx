@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { CheckCircle, Loader } from 'lucide-react'
 import { useCart } from '../hooks/useCart'
@@ -11,6 +11,8 @@ export default function Checkout() {
   const [loading, setLoading] = useState(false)
   const [orderPlaced, setOrderPlaced] = useState(false)
   const [orderId, setOrderId] = useState(null)
+  // One key per checkout: resubmitting after a timeout returns the order already placed
+  const idempotencyKey = useRef(crypto.randomUUID())
   const [formData, setFormData] = useState({
     name: '',
     email: '',
@@ -51,7 +53,7 @@ export default function Checkout() {
         shipping_address: `${formData.name}\n${formData.phone}\n${formData.address}\n${formData.city}, ${formData.state} - ${formData.pincode}`,
       }
 
-      const response = await orderAPI.create(orderData)
+      const response = await orderAPI.create(orderData, idempotencyKey.current)
       setOrderId(response.data.id)
       setOrderPlaced(true)
       clearCart()
@@ -6,6 +6,7 @@ import { productAPI } from '../services/api'
 
 export default function Home() {
   const [products, setProducts] = useState([])
+  const [facets, setFacets] = useState(null)
   const [loading, setLoading] = useState(true)
   const [searchParams, setSearchParams] = useSearchParams()
   const [showFilters, setShowFilters] = useState(false)
@@ -23,8 +24,13 @@ export default function Home() {
         if (color) params.color = color
         if (size) params.size = size
 
-        const response = await productAPI.getAll(params)
-        setProducts(response.data)
+        // One card per style; each lists its color/size variants
+        const [response, facetResponse] = await Promise.all([
+          productAPI.getStyles(params),
+          productAPI.getFacets(params),
+        ])
+        setProducts(response.data.items)
+        setFacets(facetResponse.data)
       } catch (error) {
         console.error('Error fetching products:', error)
       } finally {
@@ -51,6 +57,12 @@ export default function Home() {
 
   const hasFilters = category || color || size
 
+  // In-stock products for a filter value, given the other selected filters
+  const facetCount = (facet, value) => {
+    const entry = facets?.[facet]?.find((f) => f.value === value)
+    return entry ? ` (${entry.in_stock})` : ''
+  }
+
   return (
     <div className="min-h-screen">
       {/* Hero Section */}
@@ -132,13 +144,13 @@ export default function Home() {
                       onClick={() => updateFilter('category', 't-shirt')}
                       className={`px-4 py-2 text-sm ${category === 't-shirt' ? 'bg-aura-black text-aura-white' : 'bg-aura-white border border-aura-silver'}`}
                     >
-                      T-Shirts
+                      T-Shirts{facetCount('category', 't-shirt')}
                     </button>
                     <button
                       onClick={() => updateFilter('category', 'hoodie')}
                       className={`px-4 py-2 text-sm ${category === 'hoodie' ? 'bg-aura-black text-aura-white' : 'bg-aura-white border border-aura-silver'}`}
                     >
-                      Hoodies
+                      Hoodies{facetCount('category', 'hoodie')}
                     </button>
                   </div>
                 </div>
@@ -157,13 +169,13 @@ export default function Home() {
                       onClick={() => updateFilter('color', 'black')}
                       className={`px-4 py-2 text-sm ${color === 'black' ? 'bg-aura-black text-aura-white' : 'bg-aura-white border border-aura-silver'}`}
                     >
-                      Black
+                      Black{facetCount('color', 'black')}
                     </button>
                     <button
                       onClick={() => updateFilter('color', 'white')}
                       className={`px-4 py-2 text-sm ${color === 'white' ? 'bg-aura-black text-aura-white' : 'bg-aura-white border border-aura-silver'}`}
                     >
-                      White
+                      White{facetCount('color', 'white')}
                     </button>
                   </div>
                 </div>
@@ -184,7 +196,7 @@ export default function Home() {
                         onClick={() => updateFilter('size', s)}
                         className={`px-4 py-2 text-sm ${size === s ? 'bg-aura-black text-aura-white' : 'bg-aura-white border border-aura-silver'}`}
                       >
-                        {s}
+                        {s}{facetCount('size', s)}
                       </button>
                     ))}
                   </div>
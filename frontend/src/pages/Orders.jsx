@@ -15,13 +15,18 @@ export default function Orders() {
   const [orders, setOrders] = useState([])
   const [loading, setLoading] = useState(true)
   const [expandedOrder, setExpandedOrder] = useState(null)
+  const [orderDetails, setOrderDetails] = useState({})
+  // Order history is paged; next_cursor is null once the oldest order is loaded
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     const fetchOrders = async () => {
       try {
         setLoading(true)
-        const response = await orderAPI.getMyOrders()
-        setOrders(response.data)
+        const response = await orderAPI.getMyOrderSummaries()
+        setOrders(response.data.items)
+        setNextCursor(response.data.next_cursor)
       } catch (error) {
         console.error('Error fetching orders:', error)
       } finally {
@@ -32,6 +37,36 @@ export default function Orders() {
     fetchOrders()
   }, [])
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true)
+      const response = await orderAPI.getMyOrderSummaries({ cursor: nextCursor })
+      setOrders((loaded) => [...loaded, ...response.data.items])
+      setNextCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error('Error fetching orders:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  // Items are only loaded when an order is opened
+  const toggleOrder = async (orderId) => {
+    if (expandedOrder === orderId) {
+      setExpandedOrder(null)
+      return
+    }
+    setExpandedOrder(orderId)
+    if (!orderDetails[orderId]) {
+      try {
+        const response = await orderAPI.getById(orderId)
+        setOrderDetails((details) => ({ ...details, [orderId]: response.data }))
+      } catch (error) {
+        console.error('Error fetching order:', error)
+      }
+    }
+  }
+
   if (loading) {
     return (
       <div className="min-h-screen py-8">
@@ -78,13 +113,21 @@ export default function Orders() {
             >
               {/* Order Header */}
               <div
-                onClick={() => setExpandedOrder(expandedOrder === order.id ? null : order.id)}
+                onClick={() => toggleOrder(order.id)}
                 className="p-6 cursor-pointer hover:bg-aura-cream/50 transition-colors"
               >
                 <div className="flex items-center justify-between">
                   <div className="flex items-center space-x-4">
-                    <div className="w-12 h-12 bg-aura-cream rounded-full flex items-center justify-center">
-                      <ShoppingBag className="w-6 h-6 text-aura-charcoal" />
+                    <div className="w-12 h-12 bg-aura-cream rounded-full flex items-center justify-center overflow-hidden">
+                      {order.thumbnail_url ? (
+                        <img
+                          src={order.thumbnail_url}
+                          alt={`Order #${order.id}`}
+                          className="w-full h-full object-cover"
+                        />
+                      ) : (
+                        <ShoppingBag className="w-6 h-6 text-aura-charcoal" />
+                      )}
                     </div>
                     <div>
                       <h3 className="font-medium">Order #{order.id}</h3>
@@ -94,6 +137,8 @@ export default function Orders() {
                           month: 'long',
                           year: 'numeric',
                         })}
+                        {' • '}
+                        {order.items_count} {order.items_count === 1 ? 'item' : 'items'}
                       </p>
                     </div>
                   </div>
@@ -114,11 +159,16 @@ export default function Orders() {
               </div>
 
               {/* Order Details */}
-              {expandedOrder === order.id && (
+              {expandedOrder === order.id && !orderDetails[order.id] && (
+                <div className="border-t border-aura-cream p-6 bg-aura-cream/30">
+                  <div className="h-20 bg-aura-white rounded animate-shimmer" />
+                </div>
+              )}
+              {expandedOrder === order.id && orderDetails[order.id] && (
                 <div className="border-t border-aura-cream p-6 bg-aura-cream/30 animate-slide-down">
                   <h4 className="font-medium mb-4">Order Items</h4>
                   <div className="space-y-3">
-                    {order.items.map((item) => (
+                    {orderDetails[order.id].items.map((item) => (
                       <div
                         key={item.id}
                         className="flex items-center space-x-4 bg-aura-white p-3 rounded"
@@ -150,11 +200,11 @@ export default function Orders() {
                     ))}
                   </div>
 
-                  {order.shipping_address && (
+                  {orderDetails[order.id].shipping_address && (
                     <div className="mt-6 pt-4 border-t border-aura-cream">
                       <h4 className="font-medium mb-2">Shipping Address</h4>
                       <p className="text-sm text-aura-charcoal whitespace-pre-line">
-                        {order.shipping_address}
+                        {orderDetails[order.id].shipping_address}
                       </p>
                     </div>
                   )}
@@ -163,6 +213,14 @@ export default function Orders() {
             </div>
           ))}
         </div>
+
+        {nextCursor && (
+          <div className="mt-8 text-center">
+            <button onClick={loadMore} disabled={loadingMore} className="btn-secondary">
+              {loadingMore ? 'Loading...' : 'Load more orders'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )
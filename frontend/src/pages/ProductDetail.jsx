@@ -165,7 +165,7 @@ export default function ProductDetail() {
                 </button>
                 <span className="font-medium w-8 text-center">{quantity}</span>
                 <button
-                  onClick={() => setQuantity(Math.min(product.stock, quantity + 1))}
+                  onClick={() => setQuantity(Math.min(product.available, quantity + 1))}
                   className="w-10 h-10 flex items-center justify-center border border-aura-silver hover:border-aura-black text-lg transition-colors"
                 >
                   +
@@ -174,15 +174,15 @@ export default function ProductDetail() {
             </div>
 
             {/* Stock Status */}
-            <p className={`text-sm ${product.stock > 0 ? 'text-green-600' : 'text-red-500'}`}>
-              {product.stock > 0 ? `${product.stock} in stock` : 'Out of stock'}
+            <p className={`text-sm ${product.available > 0 ? 'text-green-600' : 'text-red-500'}`}>
+              {product.available > 0 ? `${product.available} in stock` : 'Out of stock'}
             </p>
 
             {/* Action Buttons */}
             <div className="flex flex-col sm:flex-row gap-4 pt-4">
               <button
                 onClick={handleAddToCart}
-                disabled={product.stock === 0}
+                disabled={product.available === 0}
                 className="btn-secondary flex-1 flex items-center justify-center space-x-2"
               >
                 <ShoppingBag className="w-5 h-5" />
@@ -190,7 +190,7 @@ export default function ProductDetail() {
               </button>
               <button
                 onClick={handleBuyNow}
-                disabled={product.stock === 0}
+                disabled={product.available === 0}
                 className="btn-primary flex-1"
               >
                 Buy Now
@@ -9,6 +9,13 @@ const api = axios.create({
   },
 })
 
+// After a write the API asks us to read from the primary database for a
+// short window (X-Read-Primary-Until: "<epoch seconds>:<signature>") so we see
+// our own changes. The value is echoed back exactly as received.
+const READ_PRIMARY_HEADER = 'x-read-primary-until'
+let readPrimaryUntil = 0
+let readPrimaryValue = null
+
 // Add auth token to requests
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('token')
@@ -18,12 +25,23 @@ api.interceptors.request.use((config) => {
       console.log(`[API] Attaching token to: ${config.url}`)
     }
   }
+  if (readPrimaryUntil > Date.now() / 1000) {
+    config.headers[READ_PRIMARY_HEADER] = readPrimaryValue
+  }
   return config
 })
 
 // Handle auth errors
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const value = response.headers[READ_PRIMARY_HEADER]
+    const until = parseFloat(value)
+    if (until > readPrimaryUntil) {
+      readPrimaryUntil = until
+      readPrimaryValue = value
+    }
+    return response
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem('token')
@@ -45,16 +63,44 @@ export const authAPI = {
 // Product APIs
 export const productAPI = {
   getAll: (params) => api.get('/products', { params }),
+  getStyles: (params) => api.get('/products/styles', { params }),
+  getFacets: (params) => api.get('/products/facets', { params }),
   getById: (id) => api.get(`/products/${id}`),
   create: (data) => api.post('/products', data),
   update: (id, data) => api.put(`/products/${id}`, data),
   delete: (id) => api.delete(`/products/${id}`),
 }
 
+// Cart stock holds
+export const reservationAPI = {
+  getMine: () => api.get('/reservations'),
+  hold: (productId, quantity) => api.put(`/reservations/${productId}`, { quantity }),
+  release: (productId) => api.delete(`/reservations/${productId}`),
+}
+
+// Retry requests that never got a response (flaky mobile networks). Only for
+// requests the server deduplicates, e.g. POSTs carrying an Idempotency-Key.
+const withNetworkRetry = async (send, attempts = 3) => {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await send()
+    } catch (error) {
+      if (error.response || attempt >= attempts) {
+        throw error
+      }
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** (attempt - 1)))
+    }
+  }
+}
+
 // Order APIs
 export const orderAPI = {
-  create: (data) => api.post('/orders', data),
-  getMyOrders: () => api.get('/orders/my'),
+  // Reuse one key for every attempt at the same checkout so retries cannot place a second order
+  create: (data, idempotencyKey) => withNetworkRetry(() =>
+    api.post('/orders', data, { headers: { 'Idempotency-Key': idempotencyKey } })
+  ),
+  getMyOrders: (params) => api.get('/orders/my', { params }),
+  getMyOrderSummaries: (params) => api.get('/orders/my/summary', { params }),
   getById: (id) => api.get(`/orders/${id}`),
 }
 